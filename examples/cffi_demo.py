@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+CFFI (ABI mode) binding for the DMXP FFI.
+Same API as ffi_demo.py, but calls go through CFFI's precompiled argument
+converters instead of ctypes' per-call marshalling. Requires `pip install cffi`.
+"""
+import os
+
+from cffi import FFI
+
+# Define constants
+DMXP_SUCCESS = 0
+DMXP_ERROR_EMPTY = -5
+DMXP_ERROR_TIMEOUT = -7
+
+RECV_BUF_SIZE = 65536
+
+# Batch receive: one 1 MiB payload buffer holds a full batch of max-size messages
+BATCH_BUF_SIZE = 1024 * 1024
+BATCH_MAX_MSGS = 1024
+
+ffi = FFI()
+ffi.cdef("""
+    struct FFIMessageMeta {
+        uint64_t message_id;
+        uint64_t timestamp_ns;
+        uint32_t channel_id;
+        uint32_t message_type;
+        uint32_t sender_pid;
+        uint16_t sender_runtime;
+        uint16_t flags;
+        uint32_t payload_len;
+    };
+
+    struct FFIBatchEntry {
+        uint32_t offset;
+        uint32_t len;
+        struct FFIMessageMeta meta;
+    };
+
+    int dmxp_channel_count(void);
+    int dmxp_list_channels(uint32_t *out_buf, size_t max_count, size_t *out_count);
+
+    void *dmxp_producer_new(uint32_t channel_id, uint32_t capacity);
+    int dmxp_producer_send(void *handle, const uint8_t *data, size_t len);
+    int dmxp_producer_send_batch(void *handle, const uint8_t **data_ptrs,
+                                 const size_t *data_lens, size_t count);
+    void dmxp_producer_free(void *handle);
+
+    void *dmxp_consumer_new(uint32_t channel_id);
+    int dmxp_consumer_receive_ext(void *handle, int timeout_ms, uint8_t *out_buf,
+                                  size_t *out_len, struct FFIMessageMeta *out_meta);
+    int dmxp_consumer_receive_fast(void *handle, int timeout_ms, uint8_t *out_buf,
+                                   size_t *out_len);
+    int dmxp_consumer_receive_batch(void *handle, size_t max_msgs, uint8_t *out_buf,
+                                    size_t out_buf_len, struct FFIBatchEntry *out_entries,
+                                    size_t *out_count);
+    void dmxp_consumer_free(void *handle);
+""")
+
+def _meta_dict(meta):
+    return {
+        'message_id': meta.message_id,
+        'timestamp_ns': meta.timestamp_ns,
+        'channel_id': meta.channel_id,
+        'sender_pid': meta.sender_pid
+    }
+
+class DMXP:
+    def __init__(self, lib_path=None):
+        if lib_path is None:
+            paths = [
+                "./target/debug/libdmxp_kvcache.so",
+                "./target/release/libdmxp_kvcache.so",
+                "./libdmxp_kvcache.so"
+            ]
+            for p in paths:
+                if os.path.exists(p):
+                    lib_path = p
+                    break
+
+        if lib_path is None or not os.path.exists(lib_path):
+            raise FileNotFoundError("Could not find libdmxp_kvcache.so. Run 'cargo build' first.")
+
+        self.lib = ffi.dlopen(lib_path)
+
+    def channel_count(self):
+        return self.lib.dmxp_channel_count()
+
+    def list_channels(self):
+        max_channels = 100
+        buf = ffi.new("uint32_t[]", max_channels)
+        count = ffi.new("size_t *")
+
+        if self.lib.dmxp_list_channels(buf, max_channels, count) == DMXP_SUCCESS:
+            return ffi.unpack(buf, count[0])
+        return []
+
+    def create_producer(self, channel_id, capacity=1024):
+        return Producer(self.lib, channel_id, capacity)
+
+    def create_consumer(self, channel_id, with_meta=True):
+        """with_meta=False gives a DataConsumer, whose receive() skips metadata"""
+        if with_meta:
+            return Consumer(self.lib, channel_id)
+        return DataConsumer(self.lib, channel_id)
+
+class Producer:
+    def __init__(self, lib, channel_id, capacity):
+        self.lib = lib
+        # Foreign functions cached once; skips the lib attribute lookup per call.
+        # _free is bound first so __del__ -> close() works even if setup fails.
+        self._send = lib.dmxp_producer_send
+        self._send_batch = lib.dmxp_producer_send_batch
+        self._free = lib.dmxp_producer_free
+
+        self.handle = self.lib.dmxp_producer_new(channel_id, capacity)
+        if self.handle == ffi.NULL:
+            # A NULL cdata is not None: clear it so close() does not free it
+            self.handle = None
+            raise RuntimeError(f"Failed to create producer for channel {channel_id}")
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        # bytes are passed by pointer; other buffers are aliased without a copy
+        if isinstance(data, bytes):
+            buf = data
+        else:
+            buf = ffi.from_buffer("uint8_t[]", data)
+
+        res = self._send(self.handle, buf, len(buf))
+        if res != DMXP_SUCCESS:
+            raise RuntimeError(f"Failed to send message: error {res}")
+
+    def send_batch(self, messages):
+        """
+        Send a list of messages with a single FFI call.
+        Returns: Number of messages sent
+        """
+        msgs = [m.encode('utf-8') if isinstance(m, str) else m for m in messages]
+        n = len(msgs)
+        if n == 0:
+            return 0
+
+        # The from_buffer handles keep every payload alive until the call returns
+        bufs = [ffi.from_buffer("uint8_t[]", m) for m in msgs]
+        res = self._send_batch(
+            self.handle,
+            ffi.new("uint8_t *[]", bufs),
+            ffi.new("size_t[]", [len(b) for b in bufs]),
+            n
+        )
+        if res != DMXP_SUCCESS:
+            raise RuntimeError(f"Failed to send batch: error {res}")
+        return n
+
+    def close(self):
+        if self.handle is not None:
+            self._free(self.handle)
+            self.handle = None
+
+    def __del__(self):
+        self.close()
+
+class Consumer:
+    """
+    Consumer for one channel; receive() returns (data, metadata_dict).
+    DMXP.create_consumer(..., with_meta=False) returns a DataConsumer instead.
+    """
+    # Receive entry point; DataConsumer swaps in dmxp_consumer_receive_fast
+    _RECV_FN = "dmxp_consumer_receive_ext"
+
+    def __init__(self, lib, channel_id):
+        self.lib = lib
+        # Foreign functions cached once; skips the lib attribute lookup per call.
+        # _free is bound first so __del__ -> close() works even if setup fails.
+        self._recv = getattr(lib, self._RECV_FN)
+        self._recv_batch = lib.dmxp_consumer_receive_batch
+        self._free = lib.dmxp_consumer_free
+
+        self.handle = self.lib.dmxp_consumer_new(channel_id)
+        if self.handle == ffi.NULL:
+            # A NULL cdata is not None: clear it so close() does not free it
+            self.handle = None
+            raise RuntimeError(f"Failed to create consumer for channel {channel_id}")
+
+        # Receive buffer and out-parameters, allocated once and reused
+        self.buffer = ffi.new("uint8_t[]", RECV_BUF_SIZE)
+        self._buf_view = ffi.buffer(self.buffer)
+        self._out_len = ffi.new("size_t *")
+        self._meta = ffi.new("struct FFIMessageMeta *")
+        self._meta_arg = (self._meta,)
+
+        self._batch_buf = ffi.new("uint8_t[]", BATCH_BUF_SIZE)
+        self._batch_view = ffi.buffer(self._batch_buf)
+        self._batch_entries = ffi.new("struct FFIBatchEntry[]", BATCH_MAX_MSGS)
+        self._batch_count = ffi.new("size_t *")
+
+    def _receive(self, timeout_ms, copy, extra):
+        """Shared body of both receive() variants; extra is the meta out-param, if any"""
+        self._out_len[0] = RECV_BUF_SIZE
+        c_timeout = -1 if timeout_ms is None else int(timeout_ms)
+
+        res = self._recv(self.handle, c_timeout, self.buffer, self._out_len, *extra)
+
+        if res == DMXP_SUCCESS:
+            n = self._out_len[0]
+            if copy:
+                return self._buf_view[0:n]
+            return memoryview(self._buf_view)[:n]
+        elif res == DMXP_ERROR_EMPTY or res == DMXP_ERROR_TIMEOUT:
+            return None
+        else:
+            raise RuntimeError(f"Receive failed: error {res}")
+
+    def receive(self, timeout_ms=None, copy=True):
+        """
+        Receive message with metadata.
+        timeout_ms: None (blocking), 0 (non-blocking), >0 (timeout in ms)
+        copy: If False, data is a memoryview into the receive buffer instead of bytes.
+              The view is only valid until the next receive() on this consumer.
+        Returns: (data, metadata_dict) or None if timeout/empty
+        """
+        data = self._receive(timeout_ms, copy, self._meta_arg)
+        if data is None:
+            return None
+        return data, _meta_dict(self._meta)
+
+    def receive_batch(self, max_msgs=BATCH_MAX_MSGS, with_meta=False, copy=True):
+        """
+        Receive up to max_msgs messages with a single FFI call (non-blocking).
+        with_meta: If True, each item is (data, metadata_dict) instead of data.
+        copy: If False, data items are memoryviews into the batch buffer,
+              valid only until the next receive_batch() on this consumer.
+        Returns: List of messages (empty if none available)
+        """
+        res = self._recv_batch(
+            self.handle,
+            min(max_msgs, BATCH_MAX_MSGS),
+            self._batch_buf,
+            BATCH_BUF_SIZE,
+            self._batch_entries,
+            self._batch_count
+        )
+
+        if res == DMXP_ERROR_EMPTY:
+            return []
+        if res != DMXP_SUCCESS:
+            raise RuntimeError(f"Batch receive failed: error {res}")
+
+        view = self._batch_view if copy else memoryview(self._batch_view)
+        messages = []
+        for i in range(self._batch_count[0]):
+            entry = self._batch_entries[i]
+            data = view[entry.offset:entry.offset + entry.len]
+            if with_meta:
+                data = (data, _meta_dict(entry.meta))
+            messages.append(data)
+        return messages
+
+    def close(self):
+        if self.handle is not None:
+            self._free(self.handle)
+            self.handle = None
+
+    def __del__(self):
+        self.close()
+
+class DataConsumer(Consumer):
+    """
+    Consumer whose receive() returns data only and skips metadata entirely
+    (dmxp_consumer_receive_fast).
+    """
+    _RECV_FN = "dmxp_consumer_receive_fast"
+
+    def receive(self, timeout_ms=None, copy=True):
+        """
+        Receive message payload only. Same arguments as Consumer.receive.
+        Returns: data or None if timeout/empty
+        """
+        return self._receive(timeout_ms, copy, ())
+
+def main():
+    print("Loading DMXP library (CFFI)...")
+    try:
+        dmxp = DMXP()
+    except FileNotFoundError as e:
+        print(e)
+        return
+
+    channel_id = 98
+
+    print(f"Creating producer for channel {channel_id}...")
+    producer = dmxp.create_producer(channel_id, 2048)
+
+    print(f"Active channels: {dmxp.list_channels()}")
+    print(f"Total count: {dmxp.channel_count()}")
+
+    msg = "Hello from CFFI!"
+    print(f"Sending: '{msg}'")
+    producer.send(msg)
+
+    print(f"Creating consumer for channel {channel_id}...")
+    consumer = dmxp.create_consumer(channel_id)
+
+    result = consumer.receive(timeout_ms=1000)
+    if result:
+        data, meta = result
+        print(f"Received: '{data.decode('utf-8')}'")
+        print(f"Metadata: ID={meta['message_id']}, PID={meta['sender_pid']}, Time={meta['timestamp_ns']}")
+    else:
+        print("Timed out!")
+
+    producer.send_batch([f"Batch message {i}" for i in range(3)])
+    print("\nReceiving batch...")
+    for data in consumer.receive_batch():
+        print(f"Received from batch: '{data.decode('utf-8')}'")
+
+    print("Success!")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,13 @@ DMXP_SUCCESS = 0
 DMXP_ERROR_EMPTY = -5
 DMXP_ERROR_TIMEOUT = -7
 
+# Initial size of the producer's reusable send buffer (one slot payload)
+SCRATCH_INITIAL_CAP = 1024
+
+# Batch receive: one 1 MiB payload buffer holds a full batch of max-size messages
+BATCH_BUF_SIZE = 1024 * 1024
+BATCH_MAX_MSGS = 1024
+
 class FFIMessageMeta(Structure):
     _fields_ = [
         ("message_id", c_uint64),
@@ -22,6 +29,31 @@ class FFIMessageMeta(Structure):
         ("payload_len", c_uint32),
     ]
 
+class FFIBatchEntry(Structure):
+    _fields_ = [
+        ("offset", c_uint32),
+        ("len", c_uint32),
+        ("meta", FFIMessageMeta),
+    ]
+
+def _meta_dict(meta):
+    return {
+        'message_id': meta.message_id,
+        'timestamp_ns': meta.timestamp_ns,
+        'channel_id': meta.channel_id,
+        'sender_pid': meta.sender_pid
+    }
+
+def _batch_payload(item):
+    """One send_batch() item as bytes: str is UTF-8 encoded, other buffers copied once"""
+    if isinstance(item, bytes):
+        return item
+    if isinstance(item, str):
+        return item.encode('utf-8')
+    if isinstance(item, (bytearray, memoryview)):
+        return bytes(item)
+    raise TypeError(f"send_batch() expects str, bytes, bytearray or memoryview items, got {type(item).__name__}")
+
 class DMXP:
     def __init__(self, lib_path=None):
         if lib_path is None:
@@ -50,9 +82,16 @@ class DMXP:
         self.lib.dmxp_producer_new.argtypes = [c_uint32, c_uint32]
         self.lib.dmxp_producer_new.restype = c_void_p
         
-        self.lib.dmxp_producer_send.argtypes = [c_void_p, POINTER(c_ubyte), c_size_t]
+        # c_void_p lets `bytes` be passed as-is: ctypes hands Rust the object's
+        # internal buffer pointer instead of copying it into a new array.
+        self.lib.dmxp_producer_send.argtypes = [c_void_p, c_void_p, c_size_t]
         self.lib.dmxp_producer_send.restype = c_int
         
+        # Pointer and length arrays are passed as-is; c_char_p elements keep each
+        # message's bytes alive and point straight at their buffers.
+        self.lib.dmxp_producer_send_batch.argtypes = [c_void_p, POINTER(c_char_p), POINTER(c_size_t), c_size_t]
+        self.lib.dmxp_producer_send_batch.restype = c_int
+        
         self.lib.dmxp_producer_free.argtypes = [c_void_p]
         self.lib.dmxp_producer_free.restype = None
         
@@ -62,8 +101,14 @@ class DMXP:
         self.lib.dmxp_consumer_receive_ext.argtypes = [c_void_p, c_int, POINTER(c_ubyte), POINTER(c_size_t), POINTER(FFIMessageMeta)]
         self.lib.dmxp_consumer_receive_ext.restype = c_int
         
+        self.lib.dmxp_consumer_receive_fast.argtypes = [c_void_p, c_int, POINTER(c_ubyte), POINTER(c_size_t)]
+        self.lib.dmxp_consumer_receive_fast.restype = c_int
+        
         self.lib.dmxp_consumer_free.argtypes = [c_void_p]
         self.lib.dmxp_consumer_free.restype = None
+        
+        self.lib.dmxp_consumer_receive_batch.argtypes = [c_void_p, c_size_t, POINTER(c_ubyte), c_size_t, POINTER(FFIBatchEntry), POINTER(c_size_t)]
+        self.lib.dmxp_consumer_receive_batch.restype = c_int
 
     def channel_count(self):
         return self.lib.dmxp_channel_count()
@@ -74,14 +119,17 @@ class DMXP:
         count = c_size_t(0)
         
         if self.lib.dmxp_list_channels(buf, max_channels, byref(count)) == DMXP_SUCCESS:
-            return [buf[i] for i in range(count.value)]
+            return buf[:count.value]
         return []
 
     def create_producer(self, channel_id, capacity=1024):
         return Producer(self.lib, channel_id, capacity)
 
-    def create_consumer(self, channel_id):
-        return Consumer(self.lib, channel_id)
+    def create_consumer(self, channel_id, with_meta=True):
+        """with_meta=False gives a DataConsumer, whose receive() skips metadata"""
+        if with_meta:
+            return Consumer(self.lib, channel_id)
+        return DataConsumer(self.lib, channel_id)
 
 class Producer:
     def __init__(self, lib, channel_id, capacity):
@@ -90,84 +138,199 @@ class Producer:
         if not self.handle:
             raise RuntimeError(f"Failed to create producer for channel {channel_id}")
 
+        # Foreign functions cached once; skips the CDLL attribute lookup per call
+        self._send = lib.dmxp_producer_send
+        self._send_batch = lib.dmxp_producer_send_batch
+        self._free = lib.dmxp_producer_free
+
+        # Persistent staging buffer for non-bytes payloads, grown on demand
+        self._scratch = bytearray(SCRATCH_INITIAL_CAP)
+        self._scratch_view = (c_ubyte * SCRATCH_INITIAL_CAP).from_buffer(self._scratch)
+
+    def _grow_scratch(self, size):
+        cap = max(2 * len(self._scratch), size)
+        # Drop the old view first so the old bytearray is no longer exported
+        self._scratch_view = None
+        self._scratch = bytearray(cap)
+        self._scratch_view = (c_ubyte * cap).from_buffer(self._scratch)
+
     def send(self, data):
         if isinstance(data, str):
             data = data.encode('utf-8')
-        buf = (c_ubyte * len(data)).from_buffer_copy(data)
-        res = self.lib.dmxp_producer_send(self.handle, buf, len(data))
+
+        if isinstance(data, bytes):
+            # Zero-copy: ctypes passes the bytes object's buffer directly
+            buf = data
+            size = len(data)
+        elif isinstance(data, (bytearray, memoryview)):
+            # Stage into the reusable scratch buffer (single memcpy, no new ctypes array)
+            size = data.nbytes if isinstance(data, memoryview) else len(data)
+            if size > len(self._scratch):
+                self._grow_scratch(size)
+            self._scratch[:size] = data
+            buf = self._scratch_view
+        else:
+            raise TypeError(f"send() expects str, bytes, bytearray or memoryview, got {type(data).__name__}")
+
+        res = self._send(self.handle, buf, size)
         if res != DMXP_SUCCESS:
             raise RuntimeError(f"Failed to send message: error {res}")
 
+    def send_batch(self, messages):
+        """
+        Send a list of messages with a single FFI call.
+        Items may be str, bytes, bytearray or memoryview; non-bytes are copied once.
+        Returns: Number of messages sent
+        """
+        msgs = [_batch_payload(m) for m in messages]
+        n = len(msgs)
+        if n == 0:
+            return 0
+
+        # Built per call: a c_char_p array keeps references to the payloads stored
+        # in it, so a cached one would pin the largest batch ever sent
+        ptrs = (c_char_p * n)(*msgs)
+        lens = (c_size_t * n)(*map(len, msgs))
+
+        res = self._send_batch(self.handle, ptrs, lens, n)
+        if res != DMXP_SUCCESS:
+            raise RuntimeError(f"Failed to send batch: error {res}")
+        return n
+
     def close(self):
         if self.handle:
-            self.lib.dmxp_producer_free(self.handle)
+            self._free(self.handle)
             self.handle = None
 
     def __del__(self):
         self.close()
 
 class Consumer:
+    """
+    Consumer for one channel; receive() returns (data, metadata_dict).
+    DMXP.create_consumer(..., with_meta=False) returns a DataConsumer instead.
+    """
+    # Receive entry point; DataConsumer swaps in dmxp_consumer_receive_fast
+    _RECV_FN = "dmxp_consumer_receive_ext"
+
     def __init__(self, lib, channel_id):
         self.lib = lib
         self.handle = self.lib.dmxp_consumer_new(channel_id)
         if not self.handle:
             raise RuntimeError(f"Failed to create consumer for channel {channel_id}")
+
+        # Foreign functions cached once; skips the CDLL attribute lookup per call
+        self._recv = getattr(lib, self._RECV_FN)
+        self._recv_batch = lib.dmxp_consumer_receive_batch
+        self._free = lib.dmxp_consumer_free
+
         self.buffer = (c_ubyte * 65536)() # 64KB buf
+        self._buf_addr = ctypes.addressof(self.buffer)
+        self._buf_view = memoryview(self.buffer).cast('B')
+
+        # Out-parameters reused by every receive() call
+        self._meta = FFIMessageMeta()
+        self._meta_arg = (byref(self._meta),)
+        self._out_len = c_size_t(0)
+        self._out_len_ptr = byref(self._out_len)
+
+        # Batch receive buffers, allocated once and reused for every batch
+        self._batch_buf = (c_ubyte * BATCH_BUF_SIZE)()
+        self._batch_addr = ctypes.addressof(self._batch_buf)
+        self._batch_view = memoryview(self._batch_buf).cast('B')
+        self._batch_entries = (FFIBatchEntry * BATCH_MAX_MSGS)()
+        self._batch_count = c_size_t(0)
+        self._batch_count_ptr = byref(self._batch_count)
+
+    def _receive(self, timeout_ms, copy, extra):
+        """Shared body of both receive() variants; extra is the meta out-param, if any"""
+        out_len = self._out_len
+        out_len.value = len(self.buffer)
+        c_timeout = -1 if timeout_ms is None else int(timeout_ms)
+
+        res = self._recv(self.handle, c_timeout, self.buffer, self._out_len_ptr, *extra)
 
-    def receive(self, timeout_ms=None, with_meta=True):
+        if res == DMXP_SUCCESS:
+            if copy:
+                return ctypes.string_at(self._buf_addr, out_len.value)
+            return self._buf_view[:out_len.value]
+        elif res == DMXP_ERROR_EMPTY or res == DMXP_ERROR_TIMEOUT:
+            return None
+        else:
+            raise RuntimeError(f"Receive failed: error {res}")
+
+    def receive(self, timeout_ms=None, copy=True):
         """
-        Receive message.
+        Receive message with metadata.
         timeout_ms: None (blocking), 0 (non-blocking), >0 (timeout in ms)
-        with_meta: If True, returns (bytes, metadata_dict). If False, returns bytes.
-        Returns: Data or None if timeout/empty
+        copy: If False, data is a memoryview into the receive buffer instead of bytes.
+              The view is only valid until the next receive() on this consumer.
+        Returns: (data, metadata_dict) or None if timeout/empty
         """
-        out_len = c_size_t(len(self.buffer))
-        
-        if with_meta:
-            meta = FFIMessageMeta()
-            meta_ptr = byref(meta)
-        else:
-            meta_ptr = None
-        
-        # Convert timeout arg
-        if timeout_ms is None:
-            c_timeout = -1  # Blocking
-        else:
-            c_timeout = int(timeout_ms)
-            
-        res = self.lib.dmxp_consumer_receive_ext(
-            self.handle, 
-            c_timeout, 
-            self.buffer, 
-            byref(out_len),
-            meta_ptr
+        data = self._receive(timeout_ms, copy, self._meta_arg)
+        if data is None:
+            return None
+        return data, _meta_dict(self._meta)
+
+    def receive_batch(self, max_msgs=BATCH_MAX_MSGS, with_meta=False, copy=True):
+        """
+        Receive up to max_msgs messages with a single FFI call (non-blocking).
+        with_meta: If True, each item is (data, metadata_dict) instead of data.
+        copy: If False, data items are memoryviews into the batch buffer,
+              valid only until the next receive_batch() on this consumer.
+        Returns: List of messages (empty if none available)
+        """
+        max_msgs = min(max_msgs, BATCH_MAX_MSGS)
+        res = self._recv_batch(
+            self.handle,
+            max_msgs,
+            self._batch_buf,
+            BATCH_BUF_SIZE,
+            self._batch_entries,
+            self._batch_count_ptr
         )
-        
-        if res == DMXP_SUCCESS:
-            data = bytes(self.buffer[:out_len.value])
-            if with_meta:
-                meta_dict = {
-                    'message_id': meta.message_id,
-                    'timestamp_ns': meta.timestamp_ns,
-                    'channel_id': meta.channel_id,
-                    'sender_pid': meta.sender_pid
-                }
-                return data, meta_dict
+
+        if res == DMXP_ERROR_EMPTY:
+            return []
+        if res != DMXP_SUCCESS:
+            raise RuntimeError(f"Batch receive failed: error {res}")
+
+        addr = self._batch_addr
+        view = self._batch_view
+        messages = []
+        for entry in self._batch_entries[:self._batch_count.value]:
+            off = entry.offset
+            if copy:
+                data = ctypes.string_at(addr + off, entry.len)
             else:
-                return data
-        elif res == DMXP_ERROR_EMPTY or res == DMXP_ERROR_TIMEOUT:
-            return None
-        else:
-             raise RuntimeError(f"Receive failed: error {res}")
+                data = view[off:off + entry.len]
+            if with_meta:
+                data = (data, _meta_dict(entry.meta))
+            messages.append(data)
+        return messages
 
     def close(self):
         if self.handle:
-            self.lib.dmxp_consumer_free(self.handle)
+            self._free(self.handle)
             self.handle = None
 
     def __del__(self):
         self.close()
 
+class DataConsumer(Consumer):
+    """
+    Consumer whose receive() returns data only and skips metadata entirely
+    (dmxp_consumer_receive_fast).
+    """
+    _RECV_FN = "dmxp_consumer_receive_fast"
+
+    def receive(self, timeout_ms=None, copy=True):
+        """
+        Receive message payload only. Same arguments as Consumer.receive.
+        Returns: data or None if timeout/empty
+        """
+        return self._receive(timeout_ms, copy, ())
+
 def main():
     print("Loading DMXP library...")
     try:
@@ -193,7 +356,7 @@ def main():
     consumer = dmxp.create_consumer(channel_id)
     
     print("Receiving with 1000ms timeout (WITH metadata)...")
-    result = consumer.receive(timeout_ms=1000, with_meta=True)
+    result = consumer.receive(timeout_ms=1000)
     
     if result:
         data, meta = result
@@ -205,10 +368,17 @@ def main():
     # Send another message for no-meta test
     producer.send("Message without checking metadata")
     print("\nReceiving (WITHOUT metadata)...")
-    data_only = consumer.receive(timeout_ms=1000, with_meta=False)
+    data_consumer = dmxp.create_consumer(channel_id, with_meta=False)
+    data_only = data_consumer.receive(timeout_ms=1000)
     if data_only:
          print(f"Received raw data only: '{data_only.decode('utf-8')}'")
     
+    # Batch send and receive: several messages with one FFI call each way
+    producer.send_batch([f"Batch message {i}" for i in range(3)])
+    print("\nReceiving batch...")
+    for data in consumer.receive_batch():
+        print(f"Received from batch: '{data.decode('utf-8')}'")
+    
     print("Success!")
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 use crate::Core::SharedMemory::SharedMemoryBackend;
-use crate::MPMC::Buffer::layout::{GlobalHeader, MAX_CHANNELS};
+use crate::MPMC::Buffer::layout::{
+    GlobalHeader, ACTIVE_BITMAP_VERSION, LAYOUT_VERSION, MAX_CHANNELS, MIN_LAYOUT_VERSION,
+};
 use crate::MPMC::Buffer::RingBuffer;
 use crossbeam_utils::CachePadded;
 use std::io;
@@ -74,10 +76,11 @@ impl SharedMemoryAllocator {
                 header_ptr,
                 GlobalHeader {
                     magic: MAGIC_NUMBER,
-                    version: 1,
+                    version: LAYOUT_VERSION,
                     max_channels: MAX_CHANNELS as u32,
                     channel_count: 0,
                     reserved: 0,
+                    active: std::mem::zeroed(),
                     channels: std::mem::zeroed(),
                 },
             );
@@ -109,7 +112,7 @@ impl SharedMemoryAllocator {
             ));
         }
 
-        // Verify magic number and size
+        // Verify magic number, layout version and size
         unsafe {
             if (*header).magic != MAGIC_NUMBER {
                 return Err(io::Error::new(
@@ -118,6 +121,17 @@ impl SharedMemoryAllocator {
                 ));
             }
 
+            let version = (*header).version;
+            if !(MIN_LAYOUT_VERSION..=LAYOUT_VERSION).contains(&version) {
+                return Err(io::Error::new(
+                    io::ErrorKind::InvalidData,
+                    format!(
+                        "Unsupported layout version {} (expected {}..={})",
+                        version, MIN_LAYOUT_VERSION, LAYOUT_VERSION
+                    ),
+                ));
+            }
+
             if shm.size() < min_required_size {
                 return Err(io::Error::new(
                     io::ErrorKind::InvalidData,
@@ -257,9 +271,11 @@ impl SharedMemoryAllocator {
             ring_buffer.init_slots();
         }
 
-        // Update channel count
+        // Update channel count and publish the channel in the active bitmap
         unsafe {
             (*self.header).channel_count += 1;
+            (*self.header).active[channel_id as usize / 64]
+                .fetch_or(1 << (channel_id % 64), Ordering::Release);
         }
 
         Ok(ChannelPartition {
@@ -331,16 +347,33 @@ impl SharedMemoryAllocator {
 
         // Set capacity to 0 to mark the channel as free
         channel.capacity = 0;
+        unsafe {
+            (*self.header).active[channel_id as usize / 64]
+                .fetch_and(!(1 << (channel_id % 64)), Ordering::Release);
+        }
 
         Ok(())
     }
 
     pub fn get_channels(&self) -> Vec<ChannelPartition> {
+        // Pre-bitmap regions: their creators never set `active`
+        if unsafe { (*self.header).version } < ACTIVE_BITMAP_VERSION {
+            return (0..MAX_CHANNELS as u32)
+                .filter_map(|id| self.get_channel(id))
+                .collect();
+        }
+
         let mut channels = Vec::new();
         unsafe {
-            for i in 0..MAX_CHANNELS as usize {
-                let ch = &(*self.header).channels[i];
-                if ch.capacity != 0 {
+            for (word_index, word) in (*self.header).active.iter().enumerate() {
+                let mut bits = word.load(Ordering::Acquire);
+                while bits != 0 {
+                    let i = word_index * 64 + bits.trailing_zeros() as usize;
+                    bits &= bits - 1;
+                    let ch = &(*self.header).channels[i];
+                    if ch.capacity == 0 {
+                        continue;
+                    }
                     let buffer_ptr = self.shm.as_ptr().add(ch.band_offset as usize);
                     let ring_buffer = RingBuffer::new(ch, buffer_ptr);
                     channels.push(ChannelPartition {
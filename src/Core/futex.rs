@@ -1,4 +1,5 @@
 use std::sync::atomic::AtomicU32;
+use std::time::Duration;
 
 #[cfg(target_os = "linux")]
 pub fn futex_wait(atomic: &AtomicU32, expected: u32) {
@@ -23,6 +24,37 @@ pub fn futex_wait(atomic: &AtomicU32, expected: u32) {
     }
 }
 
+/// Like `futex_wait`, but gives up after `timeout` (`None` waits forever).
+#[cfg(target_os = "linux")]
+pub fn futex_wait_timeout(atomic: &AtomicU32, expected: u32, timeout: Option<Duration>) {
+    use std::ptr;
+    use std::sync::atomic::Ordering;
+
+    if atomic.load(Ordering::Relaxed) != expected {
+        return;
+    }
+
+    let ts = timeout.map(|d| libc::timespec {
+        tv_sec: d.as_secs() as libc::time_t,
+        tv_nsec: d.subsec_nanos() as libc::c_long,
+    });
+    let ts_ptr = ts
+        .as_ref()
+        .map_or(ptr::null(), |t| t as *const libc::timespec);
+
+    unsafe {
+        libc::syscall(
+            libc::SYS_futex,
+            atomic as *const AtomicU32 as *const u32,
+            libc::FUTEX_WAIT,
+            expected,
+            ts_ptr,
+            ptr::null::<u32>(),
+            0u32,
+        );
+    }
+}
+
 #[cfg(target_os = "linux")]
 pub fn futex_wake(atomic: &AtomicU32) {
     unsafe {
@@ -44,6 +76,12 @@ pub fn futex_wait(_atomic: &AtomicU32, _expected: u32) {
     std::thread::yield_now();
 }
 
+#[cfg(not(target_os = "linux"))]
+pub fn futex_wait_timeout(_atomic: &AtomicU32, _expected: u32, _timeout: Option<Duration>) {
+    // Fallback for non-Linux: busy wait with yield
+    std::thread::yield_now();
+}
+
 #[cfg(not(target_os = "linux"))]
 pub fn futex_wake(_atomic: &AtomicU32) {
     // No-op on non-Linux
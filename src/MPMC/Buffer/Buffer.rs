@@ -26,6 +26,11 @@ pub struct Slot {
     /// Transport-only metadata (message ID, timestamp, etc.).
     pub meta: MessageMeta,
 
+    /// Padding so the payload starts on its own 64-byte line (offset 64),
+    /// as foreign readers (Python/C) expect. Added in layout version 2 (the
+    /// payload was at 48 before); any change here needs a `LAYOUT_VERSION` bump.
+    pub _pad: [u8; 16],
+
     /// Opaque byte array payload.
     pub payload: [u8; MSG_INLINE],
 }
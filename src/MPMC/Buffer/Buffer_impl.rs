@@ -182,9 +182,91 @@ impl RingBuffer {
         }
     }
 
+    /// Claim up to `max` consecutive free slots starting at the tail, for
+    /// callers that fill slots themselves (FFI batch publish).
+    /// Returns the first claimed position and how many slots were claimed, or
+    /// None if the slot at the tail is not free (ring full).
+    /// Every claimed position must then be filled with `publish_claimed`.
+    pub fn claim(&self, max: usize) -> Option<(u64, usize)> {
+        if max == 0 {
+            return Some((0, 0));
+        }
+
+        let tail_atomic = unsafe { &(*self.metadata).tail };
+
+        loop {
+            let tail = tail_atomic.load(Relaxed);
+
+            // Count the free run from tail, stopping at the first slot whose
+            // previous occupant has not been released by a consumer yet
+            let mut n = 0;
+            while n < max.min(self.capacity) {
+                let position = tail + n as u64;
+                let slot_ptr = unsafe { self.slot_mut((position as usize) & self.mask) };
+                let seq = unsafe { &(*slot_ptr).sequence }.load(Acquire);
+                let dif = seq as i64 - position as i64;
+                if dif != 0 {
+                    if n == 0 && dif < 0 {
+                        // full
+                        return None;
+                    }
+                    // end of the free run, or tail moved on under us (dif > 0)
+                    break;
+                }
+                n += 1;
+            }
+
+            if n > 0
+                && tail_atomic
+                    .compare_exchange_weak(tail, tail + n as u64, AcqRel, Relaxed)
+                    .is_ok()
+            {
+                return Some((tail, n));
+            }
+            std::hint::spin_loop();
+        }
+    }
+
+    /// Write a message into a slot claimed with `claim` and publish it.
+    ///
+    /// # Safety
+    /// `position` must come from a successful `claim` and be published once.
+    pub unsafe fn publish_claimed(&self, position: u64, meta: MessageMeta, payload: &[u8]) {
+        let slot_ptr = self.slot_mut((position as usize) & self.mask);
+        (*slot_ptr).meta = meta;
+        (*slot_ptr).meta.payload_len = payload.len() as u32;
+
+        let len = payload.len().min(MSG_INLINE);
+        ptr::copy_nonoverlapping(payload.as_ptr(), (*slot_ptr).payload.as_mut_ptr(), len);
+
+        (&(*slot_ptr).sequence).store(position + 1, Release);
+    }
+
     /// Dequeue acquires a ready slot and returns its content.
     /// Returns None if the ring appears empty.
     pub fn dequeue(&self) -> Option<(MessageMeta, Vec<u8>)> {
+        self.dequeue_with(|slot| {
+            let meta = slot.meta;
+            let len = (meta.payload_len as usize).min(MSG_INLINE);
+            (meta, slot.payload[..len].to_vec())
+        })
+    }
+
+    /// Dequeue a ready slot straight into `out` instead of a fresh Vec.
+    /// Returns the metadata and the number of bytes written, or None if the
+    /// ring appears empty. Payloads longer than `out` are truncated.
+    pub fn dequeue_into(&self, out: &mut [u8]) -> Option<(MessageMeta, usize)> {
+        self.dequeue_with(|slot| {
+            let meta = slot.meta;
+            let len = (meta.payload_len as usize).min(MSG_INLINE).min(out.len());
+            out[..len].copy_from_slice(&slot.payload[..len]);
+            (meta, len)
+        })
+    }
+
+    /// Claim the slot at head, hand it to `read` while it is still owned by this
+    /// consumer, then free it for producers. Shared body of the dequeue variants.
+    fn dequeue_with<R>(&self, read: impl FnOnce(&Slot) -> R) -> Option<R> {
         let meta_ptr = self.metadata;
         let head_atomic = unsafe { &(*meta_ptr).head };
 
@@ -200,23 +282,13 @@ impl RingBuffer {
                     .compare_exchange_weak(head, head + 1, AcqRel, Relaxed)
                     .is_ok()
                 {
-                    let (meta, payload) = unsafe {
-                        let meta = (*slot_ptr).meta;
-                        let len = meta.payload_len as usize;
-                        let mut payload = vec![0u8; len];
-                        ptr::copy_nonoverlapping(
-                            (*slot_ptr).payload.as_ptr(),
-                            payload.as_mut_ptr(),
-                            len,
-                        );
-                        (meta, payload)
-                    };
+                    let result = read(unsafe { &*slot_ptr });
 
                     // free slot for future producers
                     unsafe {
                         (&(*slot_ptr).sequence).store(head + self.capacity as u64, Release);
                     }
-                    return Some((meta, payload));
+                    return Some(result);
                 }
                 continue;
             } else if dif < 0 {
@@ -229,6 +301,7 @@ impl RingBuffer {
             }
         }
     }
+
     /// Signal consumers that new data is available
     pub fn signal_consumer(&self) {
         unsafe {
@@ -5,6 +5,25 @@ use std::sync::atomic::AtomicU64;
 /// This must be a constant to allow for a fixed-size array in the GlobalHeader.
 pub const MAX_CHANNELS: usize = 256;
 
+/// Version written to `GlobalHeader::version` by the creator of the region.
+/// Bump it whenever the shared layout changes; `attach` refuses other versions.
+///
+/// - 1: initial layout.
+/// - 2: `Slot` payload moved from offset 48 to 64 (16-byte pad after the metadata).
+/// - 3: `GlobalHeader::active` channel bitmap, in what used to be padding.
+pub const LAYOUT_VERSION: u32 = 3;
+
+/// Oldest version `attach` still accepts. Version 2 regions share the current
+/// slot layout but their creators never set the active bitmap, so channel
+/// discovery falls back to scanning every entry's capacity.
+pub const MIN_LAYOUT_VERSION: u32 = 2;
+
+/// First version whose creators maintain `GlobalHeader::active`.
+pub const ACTIVE_BITMAP_VERSION: u32 = 3;
+
+/// Number of u64 words in the `GlobalHeader::active` channel bitmap.
+pub const ACTIVE_WORDS: usize = MAX_CHANNELS / 64;
+
 /// Defines the metadata for a single MPMC channel within the global header.
 ///
 /// This struct contains the atomic cursors and layout information necessary
@@ -66,6 +85,12 @@ pub struct GlobalHeader {
     /// Reserved/padding (align to 16 or 64 bytes).
     pub reserved: u32,
 
+    /// Bitmap of active channels: bit `id % 64` of word `id / 64` is set while
+    /// channel `id` is configured. Lets readers discover channels by scanning
+    /// 32 contiguous bytes instead of touching every `ChannelEntry`.
+    /// Lives in what used to be padding, so all other offsets are unchanged.
+    pub active: [AtomicU64; ACTIVE_WORDS],
+
     /// The table of metadata for each channel.
     pub channels: [ChannelEntry; MAX_CHANNELS],
 }
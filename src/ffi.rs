@@ -1,8 +1,14 @@
 use crate::Core::alloc::SharedMemoryAllocator;
+use crate::Core::futex::futex_wait_timeout;
+use crate::MPMC::Buffer::layout::ChannelEntry;
+use crate::MPMC::Buffer::{RingBuffer, MSG_INLINE};
 use crate::MPMC::ChannelBuilder;
 use crate::MPMC::Consumer;
 use crate::MPMC::Producer;
+use crate::MPMC::Structs::MessageMeta;
 use std::ptr;
+use std::sync::atomic::{AtomicU32, AtomicU64, Ordering};
+use std::time::{Duration, Instant, SystemTime, UNIX_EPOCH};
 
 // Error codes
 const DMXP_SUCCESS: i32 = 0;
@@ -13,6 +19,9 @@ const DMXP_ERROR_EMPTY: i32 = -5;
 const DMXP_ERROR_INTERNAL: i32 = -6;
 const DMXP_ERROR_TIMEOUT: i32 = -7;
 
+/// Number of spin iterations `dmxp_channel_wait` makes before parking on the futex.
+const CHANNEL_WAIT_SPINS: u32 = 200;
+
 /// Handle to a producer instance (opaque pointer)
 pub struct ProducerHandle {
     inner: Producer,
@@ -37,6 +46,30 @@ pub struct FFIMessageMeta {
     pub payload_len: u32,
 }
 
+impl From<&MessageMeta> for FFIMessageMeta {
+    fn from(meta: &MessageMeta) -> Self {
+        Self {
+            message_id: meta.message_id,
+            timestamp_ns: meta.timestamp_ns,
+            channel_id: meta.channel_id,
+            message_type: meta.message_type,
+            sender_pid: meta.sender_pid,
+            sender_runtime: meta.sender_runtime,
+            flags: meta.flags,
+            payload_len: meta.payload_len,
+        }
+    }
+}
+
+/// Descriptor for one message returned by `dmxp_consumer_receive_batch`.
+/// The payload lives at `out_buf[offset..offset + len]`.
+#[repr(C)]
+pub struct FFIBatchEntry {
+    pub offset: u32,
+    pub len: u32,
+    pub meta: FFIMessageMeta,
+}
+
 // -----------------------------------------------------------------------------
 // Allocator / Utils
 // -----------------------------------------------------------------------------
@@ -266,14 +299,7 @@ pub extern "C" fn dmxp_consumer_receive_ext(
             *out_len = data.len();
 
             if !out_meta.is_null() {
-                (*out_meta).message_id = meta.message_id;
-                (*out_meta).timestamp_ns = meta.timestamp_ns;
-                (*out_meta).channel_id = meta.channel_id;
-                (*out_meta).message_type = meta.message_type;
-                (*out_meta).sender_pid = meta.sender_pid;
-                (*out_meta).sender_runtime = meta.sender_runtime;
-                (*out_meta).flags = meta.flags;
-                (*out_meta).payload_len = meta.payload_len;
+                *out_meta = FFIMessageMeta::from(&meta);
             }
         }
         DMXP_SUCCESS
@@ -282,6 +308,20 @@ pub extern "C" fn dmxp_consumer_receive_ext(
     }
 }
 
+/// Receive a message payload only, without metadata.
+///
+/// Same timeout semantics as `dmxp_consumer_receive_ext`, but with no
+/// metadata out-parameter for callers that never read it.
+#[no_mangle]
+pub extern "C" fn dmxp_consumer_receive_fast(
+    handle: *mut ConsumerHandle,
+    timeout_ms: i32,
+    out_buf: *mut u8,
+    out_len: *mut usize,
+) -> i32 {
+    dmxp_consumer_receive_ext(handle, timeout_ms, out_buf, out_len, ptr::null_mut())
+}
+
 /// Same as above but strictly for backwards compatibility/simplicity
 #[no_mangle]
 pub extern "C" fn dmxp_consumer_receive(
@@ -294,6 +334,60 @@ pub extern "C" fn dmxp_consumer_receive(
     dmxp_consumer_receive_ext(handle, timeout, out_buf, out_len, ptr::null_mut())
 }
 
+/// Receive up to `max_msgs` messages in a single call (non-blocking).
+///
+/// Payloads are packed back to back into `out_buf`, and one `FFIBatchEntry`
+/// per message is written to `out_entries` (which must hold `max_msgs` entries).
+/// A message is only dequeued while a maximum-size payload still fits in
+/// `out_buf`, so nothing is ever dropped for lack of space.
+///
+/// # Returns
+/// * 0 on success, with `out_count` set to the number of messages written.
+/// * `DMXP_ERROR_EMPTY` if no message was available.
+#[no_mangle]
+pub extern "C" fn dmxp_consumer_receive_batch(
+    handle: *mut ConsumerHandle,
+    max_msgs: usize,
+    out_buf: *mut u8,
+    out_buf_len: usize,
+    out_entries: *mut FFIBatchEntry,
+    out_count: *mut usize,
+) -> i32 {
+    if handle.is_null() || out_buf.is_null() || out_entries.is_null() || out_count.is_null() {
+        return DMXP_ERROR_NULL_POINTER;
+    }
+
+    let consumer = unsafe { &(*handle).inner };
+    let mut count = 0;
+    let mut used = 0;
+
+    while count < max_msgs && out_buf_len - used >= MSG_INLINE {
+        match consumer.receive_with_meta() {
+            Ok(Some((meta, data))) => unsafe {
+                ptr::copy_nonoverlapping(data.as_ptr(), out_buf.add(used), data.len());
+                *out_entries.add(count) = FFIBatchEntry {
+                    offset: used as u32,
+                    len: data.len() as u32,
+                    meta: FFIMessageMeta::from(&meta),
+                };
+                used += data.len();
+                count += 1;
+            },
+            Ok(None) => break,
+            Err(_) if count > 0 => break,
+            Err(_) => return DMXP_ERROR_INTERNAL,
+        }
+    }
+
+    unsafe { *out_count = count };
+
+    if count == 0 {
+        DMXP_ERROR_EMPTY
+    } else {
+        DMXP_SUCCESS
+    }
+}
+
 #[no_mangle]
 pub extern "C" fn dmxp_consumer_free(handle: *mut ConsumerHandle) {
     if !handle.is_null() {
@@ -302,3 +396,289 @@ pub extern "C" fn dmxp_consumer_free(handle: *mut ConsumerHandle) {
         }
     }
 }
+
+// -----------------------------------------------------------------------------
+// Atomics
+// -----------------------------------------------------------------------------
+// Helpers for runtimes that map the shared memory region themselves (e.g. the
+// pure-Python consumer) and need real atomic access to the channel cursors.
+
+/// Atomically load a u64 cursor with Acquire ordering.
+///
+/// `addr` must point to an 8-byte aligned u64 in shared memory.
+/// Returns 0 if `addr` is null.
+#[no_mangle]
+pub extern "C" fn dmxp_atomic_load_u64(addr: *const u64) -> u64 {
+    if addr.is_null() {
+        return 0;
+    }
+    unsafe { (*(addr as *const AtomicU64)).load(Ordering::Acquire) }
+}
+
+/// Atomically store a u64 cursor with Release ordering.
+#[no_mangle]
+pub extern "C" fn dmxp_atomic_store_u64(addr: *mut u64, value: u64) {
+    if addr.is_null() {
+        return;
+    }
+    unsafe { (*(addr as *const AtomicU64)).store(value, Ordering::Release) }
+}
+
+/// Atomically add `delta` to a u64 cursor (AcqRel) and return the previous value.
+/// Returns 0 if `addr` is null.
+#[no_mangle]
+pub extern "C" fn dmxp_atomic_fetch_add_u64(addr: *mut u64, delta: u64) -> u64 {
+    if addr.is_null() {
+        return 0;
+    }
+    unsafe { (*(addr as *const AtomicU64)).fetch_add(delta, Ordering::AcqRel) }
+}
+
+/// Atomically add `delta` to a u32 word (AcqRel, wrapping) and return the previous value,
+/// e.g. to bump a channel's futex signal word from another runtime.
+/// Returns 0 if `addr` is null.
+#[no_mangle]
+pub extern "C" fn dmxp_atomic_fetch_add_u32(addr: *mut u32, delta: u32) -> u32 {
+    if addr.is_null() {
+        return 0;
+    }
+    unsafe { (*(addr as *const AtomicU32)).fetch_add(delta, Ordering::AcqRel) }
+}
+
+/// Atomically replace a u64 cursor with `desired` if it still equals `expected`
+/// (AcqRel on success, Acquire on failure).
+/// Returns true if the swap happened; false otherwise or if `addr` is null.
+#[no_mangle]
+pub extern "C" fn dmxp_atomic_compare_exchange_u64(
+    addr: *mut u64,
+    expected: u64,
+    desired: u64,
+) -> bool {
+    if addr.is_null() {
+        return false;
+    }
+    unsafe {
+        (*(addr as *const AtomicU64))
+            .compare_exchange(expected, desired, Ordering::AcqRel, Ordering::Acquire)
+            .is_ok()
+    }
+}
+
+/// Wait until a channel has been written past `head`.
+///
+/// Spins briefly on the channel's tail cursor, then parks on its futex signal
+/// word (which producers bump and wake on every publish) instead of burning CPU.
+///
+/// # Arguments
+/// * `entry` - Pointer to the channel's `ChannelEntry` in shared memory.
+/// * `head` - The consumer's current head cursor.
+/// * `timeout_ns` - Maximum wait in nanoseconds, or -1 to wait forever.
+///
+/// # Returns
+/// * 0 once `tail > head`.
+/// * `DMXP_ERROR_TIMEOUT` if the timeout elapsed first.
+#[no_mangle]
+pub extern "C" fn dmxp_channel_wait(entry: *const ChannelEntry, head: u64, timeout_ns: i64) -> i32 {
+    if entry.is_null() {
+        return DMXP_ERROR_NULL_POINTER;
+    }
+
+    let entry = unsafe { &*entry };
+    let has_data = || entry.tail.load(Ordering::Acquire) > head;
+
+    for _ in 0..CHANNEL_WAIT_SPINS {
+        if has_data() {
+            return DMXP_SUCCESS;
+        }
+        std::hint::spin_loop();
+    }
+
+    let deadline =
+        (timeout_ns >= 0).then(|| Instant::now() + Duration::from_nanos(timeout_ns as u64));
+
+    loop {
+        // Read the signal before re-checking, so a publish in between is not missed
+        let signal = entry.signal.load(Ordering::Acquire);
+        if has_data() {
+            return DMXP_SUCCESS;
+        }
+
+        let remaining = match deadline {
+            Some(deadline) => {
+                let now = Instant::now();
+                if now >= deadline {
+                    return DMXP_ERROR_TIMEOUT;
+                }
+                Some(deadline - now)
+            }
+            None => None,
+        };
+
+        futex_wait_timeout(&entry.signal, signal, remaining);
+    }
+}
+
+/// Drain up to `max_msgs` messages from a channel into caller-owned buffers.
+///
+/// Native counterpart of the pure-Python consumer's drain loop: the whole
+/// cursor/sequence/copy loop runs here, so the caller pays one FFI call per
+/// batch instead of several per message.
+///
+/// # Arguments
+/// * `entry` - Pointer to the channel's `ChannelEntry` in shared memory.
+/// * `band` - Pointer to the start of the channel's slot array (`base + band_offset`).
+/// * `max_msgs` - Maximum number of messages to drain (at most the length of `out_entries`).
+/// * `out_buf` - Buffer receiving the payloads back to back.
+/// * `out_buf_len` - Size of `out_buf` in bytes.
+/// * `out_entries` - Array of at least `max_msgs` descriptors, filled in order.
+/// * `out_count` - Output: number of messages drained.
+///
+/// # Returns
+/// * 0 on success, with `out_count` set to the number of messages drained.
+/// * `DMXP_ERROR_EMPTY` if no message was available.
+#[no_mangle]
+pub extern "C" fn dmxp_channel_drain(
+    entry: *const ChannelEntry,
+    band: *mut u8,
+    max_msgs: usize,
+    out_buf: *mut u8,
+    out_buf_len: usize,
+    out_entries: *mut FFIBatchEntry,
+    out_count: *mut usize,
+) -> i32 {
+    if entry.is_null()
+        || band.is_null()
+        || out_buf.is_null()
+        || out_entries.is_null()
+        || out_count.is_null()
+    {
+        return DMXP_ERROR_NULL_POINTER;
+    }
+    if unsafe { (*entry).capacity } == 0 {
+        return DMXP_ERROR_INVALID_ARG;
+    }
+
+    let ring = unsafe { RingBuffer::new(entry, band) };
+    let out = unsafe { std::slice::from_raw_parts_mut(out_buf, out_buf_len) };
+    let mut count = 0;
+    let mut used = 0;
+
+    while count < max_msgs && out_buf_len - used >= MSG_INLINE {
+        match ring.dequeue_into(&mut out[used..]) {
+            Some((meta, len)) => {
+                unsafe {
+                    *out_entries.add(count) = FFIBatchEntry {
+                        offset: used as u32,
+                        len: len as u32,
+                        meta: FFIMessageMeta::from(&meta),
+                    };
+                }
+                used += len;
+                count += 1;
+            }
+            None => break,
+        }
+    }
+
+    unsafe { *out_count = count };
+
+    if count == 0 {
+        DMXP_ERROR_EMPTY
+    } else {
+        DMXP_SUCCESS
+    }
+}
+
+/// Publish up to `count` messages into a channel from caller-owned buffers.
+///
+/// Native counterpart of the pure-Python producer's send loop. Slots are
+/// claimed with the ring's own protocol (`RingBuffer::claim`: a slot is free
+/// only once a consumer has released it, and the tail advances by CAS), so it
+/// is safe alongside Rust producers and consumers. Each message is published
+/// with `sequence = position + 1`, then consumers are woken once.
+///
+/// # Arguments
+/// * `entry` - Pointer to the channel's `ChannelEntry` in shared memory.
+/// * `band` - Pointer to the start of the channel's slot array (`base + band_offset`).
+/// * `data_ptrs` / `data_lens` - `count` payload pointers and lengths.
+/// * `first_message_id` - `message_id` of the first message; the rest follow on.
+/// * `sender_pid` - Written to every message's metadata.
+/// * `out_sent` - Output: number of messages published (limited by free slots).
+///
+/// # Returns
+/// * 0 on success (possibly with fewer than `count` sent if the ring filled up).
+/// * `DMXP_ERROR_CHANNEL_FULL` if no slot was free.
+/// * `DMXP_ERROR_INVALID_ARG` if any payload exceeds `MSG_INLINE` or the
+///   capacity is not a power of two; nothing is written.
+#[no_mangle]
+pub extern "C" fn dmxp_channel_publish(
+    entry: *const ChannelEntry,
+    band: *mut u8,
+    data_ptrs: *const *const u8,
+    data_lens: *const usize,
+    count: usize,
+    first_message_id: u64,
+    sender_pid: u32,
+    out_sent: *mut usize,
+) -> i32 {
+    if entry.is_null()
+        || band.is_null()
+        || data_ptrs.is_null()
+        || data_lens.is_null()
+        || out_sent.is_null()
+    {
+        return DMXP_ERROR_NULL_POINTER;
+    }
+    unsafe { *out_sent = 0 };
+
+    let capacity = unsafe { (*entry).capacity };
+    if capacity == 0 || (capacity & (capacity - 1)) != 0 {
+        return DMXP_ERROR_INVALID_ARG;
+    }
+
+    let ptrs = unsafe { std::slice::from_raw_parts(data_ptrs, count) };
+    let lens = unsafe { std::slice::from_raw_parts(data_lens, count) };
+    if ptrs.iter().any(|p| p.is_null()) {
+        return DMXP_ERROR_NULL_POINTER;
+    }
+    if lens.iter().any(|&len| len > MSG_INLINE) {
+        return DMXP_ERROR_INVALID_ARG;
+    }
+    if count == 0 {
+        return DMXP_SUCCESS;
+    }
+
+    let ring = unsafe { RingBuffer::new(entry, band) };
+    let (start, n) = match ring.claim(count) {
+        Some(claimed) => claimed,
+        None => return DMXP_ERROR_CHANNEL_FULL,
+    };
+
+    let timestamp_ns = SystemTime::now()
+        .duration_since(UNIX_EPOCH)
+        .unwrap_or_default()
+        .as_nanos() as u64;
+    let channel_id = unsafe { (*entry).channel_id };
+
+    for i in 0..n {
+        let meta = MessageMeta {
+            message_id: first_message_id + i as u64,
+            timestamp_ns,
+            channel_id,
+            message_type: 0,
+            sender_pid,
+            sender_runtime: 0, // Python
+            flags: 0,
+            payload_len: lens[i] as u32,
+        };
+        unsafe {
+            let payload = std::slice::from_raw_parts(ptrs[i], lens[i]);
+            ring.publish_claimed(start + i as u64, meta, payload);
+        }
+    }
+
+    unsafe { *out_sent = n };
+    ring.signal_consumer();
+
+    DMXP_SUCCESS
+}
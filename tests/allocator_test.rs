@@ -1,7 +1,7 @@
 // tests/allocator_test.rs
 
 use dmxp_kvcache::Core::alloc::SharedMemoryAllocator;
-use dmxp_kvcache::MPMC::Buffer::layout::GlobalHeader;
+use dmxp_kvcache::MPMC::Buffer::layout::{GlobalHeader, MIN_LAYOUT_VERSION};
 use dmxp_kvcache::MPMC::Buffer::RingBuffer;
 use std::fs;
 use std::io;
@@ -274,11 +274,67 @@ fn test_get_channels_and_count() -> io::Result<()> {
     assert_eq!(allocator.channel_count(), 8);
     assert_eq!(allocator.get_channels().len(), 8);
 
+    // Removing a channel clears its active bit
+    allocator.remove_channel(1)?;
+    let channel_ids: Vec<u32> = allocator.get_channels().iter().map(|c| c.id()).collect();
+    assert_eq!(channel_ids, vec![0, 2, 3, 4, 5, 6, 7]);
+
     println!("✓ All channel enumeration tests passed!");
 
     Ok(())
 }
 
+#[test]
+fn test_attach_rejects_other_layout_version() -> io::Result<()> {
+    use std::os::unix::fs::FileExt;
+
+    let _guard = TEST_LOCK.lock();
+    cleanup_shared_memory();
+
+    let size = 4 * 1024 * 1024;
+    let _allocator = SharedMemoryAllocator::new(size)?;
+    assert!(SharedMemoryAllocator::attach(size).is_ok());
+
+    // Rewrite GlobalHeader.version (offset 8) as a region from an older build
+    let shm = fs::OpenOptions::new()
+        .write(true)
+        .open("/dev/shm/dmxp_alloc")?;
+    shm.write_at(&(MIN_LAYOUT_VERSION - 1).to_le_bytes(), 8)?;
+
+    let err = SharedMemoryAllocator::attach(size)
+        .err()
+        .expect("attach should reject a mismatched layout version");
+    assert_eq!(err.kind(), io::ErrorKind::InvalidData);
+
+    Ok(())
+}
+
+#[test]
+fn test_get_channels_on_pre_bitmap_region() -> io::Result<()> {
+    use std::os::unix::fs::FileExt;
+
+    let _guard = TEST_LOCK.lock();
+    cleanup_shared_memory();
+
+    let size = 4 * 1024 * 1024;
+    let allocator = SharedMemoryAllocator::new(size)?;
+    allocator.create_channel(64, None)?;
+    allocator.create_channel(64, None)?;
+
+    // A version 2 creator leaves the bitmap (offset 24) as zeroed padding
+    let shm = fs::OpenOptions::new()
+        .write(true)
+        .open("/dev/shm/dmxp_alloc")?;
+    shm.write_at(&MIN_LAYOUT_VERSION.to_le_bytes(), 8)?;
+    shm.write_at(&[0u8; 32], 24)?;
+
+    let attached = SharedMemoryAllocator::attach(size)?;
+    let channel_ids: Vec<u32> = attached.get_channels().iter().map(|c| c.id()).collect();
+    assert_eq!(channel_ids, vec![0, 1]);
+
+    Ok(())
+}
+
 #[test]
 fn test_memory_tracking() -> io::Result<()> {
     let _guard = TEST_LOCK.lock();
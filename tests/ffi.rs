@@ -0,0 +1,262 @@
+// Tests for the FFI helpers that operate directly on a channel's
+// ChannelEntry and slot band (the pointers Python passes in after mmap).
+use crossbeam_utils::CachePadded;
+use dmxp_kvcache::ffi::{
+    dmxp_atomic_compare_exchange_u64, dmxp_atomic_fetch_add_u32, dmxp_channel_drain,
+    dmxp_channel_publish, FFIBatchEntry,
+};
+use dmxp_kvcache::MPMC::Buffer::layout::ChannelEntry;
+use dmxp_kvcache::MPMC::Buffer::RingBuffer;
+use dmxp_kvcache::MPMC::Buffer::MSG_INLINE;
+use dmxp_kvcache::MPMC::Structs::Buffer_Structs::MessageMeta;
+use std::alloc::{alloc, dealloc, Layout};
+use std::sync::atomic::{AtomicU32, AtomicU64, Ordering};
+
+// Return codes, as seen by C/Python callers
+const DMXP_SUCCESS: i32 = 0;
+const DMXP_ERROR_INVALID_ARG: i32 = -2;
+const DMXP_ERROR_CHANNEL_FULL: i32 = -4;
+const DMXP_ERROR_EMPTY: i32 = -5;
+
+fn create_dummy_channel_entry(capacity: u64) -> ChannelEntry {
+    ChannelEntry {
+        channel_id: 0,
+        flags: 0,
+        capacity,
+        band_offset: 0,
+        signal: AtomicU32::new(0),
+        tail: CachePadded::new(AtomicU64::new(0)),
+        head: CachePadded::new(AtomicU64::new(0)),
+        _pad: [],
+    }
+}
+
+fn make_aligned_backing(capacity: usize) -> (*mut u8, Layout) {
+    let size = capacity * RingBuffer::slot_stride();
+    let layout = Layout::from_size_align(size, 128).unwrap();
+    let ptr = unsafe { alloc(layout) };
+    if ptr.is_null() {
+        panic!("Failed to allocate aligned memory");
+    }
+    (ptr, layout)
+}
+
+/// Call dmxp_channel_drain and return its code plus the filled entries.
+fn drain(
+    entry: &ChannelEntry,
+    band: *mut u8,
+    max_msgs: usize,
+    out: &mut [u8],
+) -> (i32, Vec<FFIBatchEntry>) {
+    let mut entries: Vec<FFIBatchEntry> = Vec::with_capacity(max_msgs);
+    let mut count = usize::MAX;
+    let rc = dmxp_channel_drain(
+        entry,
+        band,
+        max_msgs,
+        out.as_mut_ptr(),
+        out.len(),
+        entries.as_mut_ptr(),
+        &mut count,
+    );
+    assert!(count <= max_msgs);
+    unsafe { entries.set_len(count) };
+    (rc, entries)
+}
+
+/// Call dmxp_channel_publish and return its code plus the number sent.
+fn publish(entry: &ChannelEntry, band: *mut u8, payloads: &[&[u8]], first_id: u64) -> (i32, usize) {
+    let ptrs: Vec<*const u8> = payloads.iter().map(|p| p.as_ptr()).collect();
+    let lens: Vec<usize> = payloads.iter().map(|p| p.len()).collect();
+    let mut sent = usize::MAX;
+    let rc = dmxp_channel_publish(
+        entry,
+        band,
+        ptrs.as_ptr(),
+        lens.as_ptr(),
+        payloads.len(),
+        first_id,
+        42,
+        &mut sent,
+    );
+    (rc, sent)
+}
+
+#[test]
+fn channel_drain_copies_messages_back_to_back() {
+    let capacity = 8;
+    let (band, layout) = make_aligned_backing(capacity);
+    let entry = create_dummy_channel_entry(capacity as u64);
+    let rb = unsafe { RingBuffer::new(&entry, band) };
+    unsafe {
+        rb.init_slots();
+    }
+
+    for (i, payload) in [&b"one"[..], b"second", b"3"].iter().enumerate() {
+        let meta = MessageMeta {
+            message_id: i as u64,
+            ..MessageMeta::default()
+        };
+        assert!(rb.enqueue(meta, payload).is_some());
+    }
+
+    let mut out = vec![0u8; 4 * MSG_INLINE];
+
+    // max_msgs caps the batch; the rest stays queued
+    let (rc, entries) = drain(&entry, band, 2, &mut out);
+    assert_eq!(rc, DMXP_SUCCESS);
+    assert_eq!(entries.len(), 2);
+    assert_eq!((entries[0].offset, entries[0].len), (0, 3));
+    assert_eq!((entries[1].offset, entries[1].len), (3, 6));
+    assert_eq!(&out[..9], b"onesecond");
+    assert_eq!(entries[1].meta.message_id, 1);
+
+    let (rc, entries) = drain(&entry, band, 8, &mut out);
+    assert_eq!(rc, DMXP_SUCCESS);
+    assert_eq!(entries.len(), 1);
+    assert_eq!(entries[0].meta.message_id, 2);
+    assert_eq!(&out[..1], b"3");
+
+    let (rc, entries) = drain(&entry, band, 8, &mut out);
+    assert_eq!(rc, DMXP_ERROR_EMPTY);
+    assert!(entries.is_empty());
+
+    unsafe { dealloc(band, layout) };
+}
+
+#[test]
+fn channel_drain_stops_before_out_buf_runs_short() {
+    let capacity = 4;
+    let (band, layout) = make_aligned_backing(capacity);
+    let entry = create_dummy_channel_entry(capacity as u64);
+    let rb = unsafe { RingBuffer::new(&entry, band) };
+    unsafe {
+        rb.init_slots();
+    }
+
+    for _ in 0..3 {
+        assert!(rb.enqueue(MessageMeta::default(), b"abc").is_some());
+    }
+
+    // Room for one max-size payload only: one message per call, none lost
+    let mut out = vec![0u8; MSG_INLINE + 1];
+    for _ in 0..3 {
+        let (rc, entries) = drain(&entry, band, 8, &mut out);
+        assert_eq!(rc, DMXP_SUCCESS);
+        assert_eq!(entries.len(), 1);
+        assert_eq!(&out[..3], b"abc");
+    }
+    assert_eq!(drain(&entry, band, 8, &mut out).0, DMXP_ERROR_EMPTY);
+
+    unsafe { dealloc(band, layout) };
+}
+
+#[test]
+fn channel_publish_partial_batch_on_nearly_full_ring() {
+    let capacity = 4;
+    let (band, layout) = make_aligned_backing(capacity);
+    let entry = create_dummy_channel_entry(capacity as u64);
+    let rb = unsafe { RingBuffer::new(&entry, band) };
+    unsafe {
+        rb.init_slots();
+    }
+
+    for _ in 0..3 {
+        assert!(rb.enqueue(MessageMeta::default(), b"old").is_some());
+    }
+
+    // One slot left: only the first message of the batch goes in
+    let (rc, sent) = publish(&entry, band, &[b"new0", b"new1", b"new2"], 10);
+    assert_eq!((rc, sent), (DMXP_SUCCESS, 1));
+    assert_eq!(entry.tail.load(Ordering::Acquire), 4);
+    assert_eq!(entry.signal.load(Ordering::Acquire), 1);
+
+    let (rc, sent) = publish(&entry, band, &[b"new1"], 11);
+    assert_eq!((rc, sent), (DMXP_ERROR_CHANNEL_FULL, 0));
+
+    for _ in 0..3 {
+        assert_eq!(rb.dequeue().unwrap().1, b"old");
+    }
+    let (meta, data) = rb.dequeue().unwrap();
+    assert_eq!(data, b"new0");
+    assert_eq!(
+        (meta.message_id, meta.sender_pid, meta.payload_len),
+        (10, 42, 4)
+    );
+
+    // Released slots are reused across the wrap
+    let (rc, sent) = publish(&entry, band, &[b"a", b"b", b"c", b"d", b"e"], 11);
+    assert_eq!((rc, sent), (DMXP_SUCCESS, 4));
+    for expected in [b"a", b"b", b"c", b"d"] {
+        assert_eq!(rb.dequeue().unwrap().1, expected);
+    }
+
+    unsafe { dealloc(band, layout) };
+}
+
+#[test]
+fn channel_publish_waits_for_slot_release() {
+    let capacity = 2;
+    let (band, layout) = make_aligned_backing(capacity);
+    let entry = create_dummy_channel_entry(capacity as u64);
+    let rb = unsafe { RingBuffer::new(&entry, band) };
+    unsafe {
+        rb.init_slots();
+    }
+
+    assert_eq!(publish(&entry, band, &[b"x", b"y"], 0), (DMXP_SUCCESS, 2));
+
+    // A consumer that has claimed head but is still copying has not released
+    // the slot yet: tail - head says there is room, the sequence says no
+    entry.head.store(1, Ordering::Release);
+    assert_eq!(
+        publish(&entry, band, &[b"z"], 2),
+        (DMXP_ERROR_CHANNEL_FULL, 0)
+    );
+
+    unsafe { dealloc(band, layout) };
+}
+
+#[test]
+fn channel_publish_rejects_oversized_payload_without_writing() {
+    let capacity = 4;
+    let (band, layout) = make_aligned_backing(capacity);
+    let entry = create_dummy_channel_entry(capacity as u64);
+    let rb = unsafe { RingBuffer::new(&entry, band) };
+    unsafe {
+        rb.init_slots();
+    }
+
+    let oversized = vec![0u8; MSG_INLINE + 1];
+    let (rc, sent) = publish(&entry, band, &[b"fits", &oversized], 0);
+    assert_eq!((rc, sent), (DMXP_ERROR_INVALID_ARG, 0));
+    assert_eq!(entry.tail.load(Ordering::Acquire), 0);
+    assert_eq!(entry.signal.load(Ordering::Acquire), 0);
+    assert!(rb.dequeue().is_none());
+
+    unsafe { dealloc(band, layout) };
+}
+
+#[test]
+fn atomic_compare_exchange_swaps_only_the_expected_value() {
+    let mut cursor: u64 = 5;
+
+    assert!(!dmxp_atomic_compare_exchange_u64(&mut cursor, 4, 9));
+    assert_eq!(cursor, 5);
+    assert!(dmxp_atomic_compare_exchange_u64(&mut cursor, 5, 9));
+    assert_eq!(cursor, 9);
+    assert!(!dmxp_atomic_compare_exchange_u64(
+        std::ptr::null_mut(),
+        0,
+        1
+    ));
+}
+
+#[test]
+fn atomic_fetch_add_u32_wraps() {
+    let mut signal: u32 = u32::MAX;
+
+    assert_eq!(dmxp_atomic_fetch_add_u32(&mut signal, 1), u32::MAX);
+    assert_eq!(signal, 0);
+    assert_eq!(dmxp_atomic_fetch_add_u32(std::ptr::null_mut(), 1), 0);
+}
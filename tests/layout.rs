@@ -3,6 +3,8 @@
 // MessageMeta and SlotHeader. They also print the observed values
 // to aid debugging when a mismatch occurs on a given platform.
 // use dmxp_kvcache::MPMC::Buffer::SlotHeader; // Removed
+use dmxp_kvcache::MPMC::Buffer::layout::{GlobalHeader, LAYOUT_VERSION, MIN_LAYOUT_VERSION};
+use dmxp_kvcache::MPMC::Buffer::Slot;
 use dmxp_kvcache::MPMC::Structs::MessageMeta;
 use memoffset::offset_of;
 use std::mem::{align_of, size_of};
@@ -44,3 +46,57 @@ fn test_message_meta_layout() {
 
 // SlotHeader test removed as SlotHeader struct no longer exists.
 // See Buffer::Slot for the current slot layout.
+
+#[test]
+fn test_slot_layout() {
+    let size = size_of::<Slot>();
+    let off_sequence = offset_of!(Slot, sequence);
+    let off_meta = offset_of!(Slot, meta);
+    let off_payload = offset_of!(Slot, payload);
+
+    println!(
+        "Slot => size: {size}, align: {}, offsets: [sequence:{off_sequence}, meta:{off_meta}, payload:{off_payload}]",
+        align_of::<Slot>()
+    );
+
+    // Python and C readers hardcode these offsets
+    assert_eq!(size, 1088);
+    assert_eq!(align_of::<Slot>(), 64);
+    assert_eq!(off_sequence, 0);
+    assert_eq!(off_meta, 8);
+    assert_eq!(off_payload, 64);
+}
+
+#[test]
+fn test_slot_payload_offset_matches_layout_version() {
+    let off_pad = offset_of!(Slot, _pad);
+    let off_payload = offset_of!(Slot, payload);
+
+    println!("Slot v{LAYOUT_VERSION} => offsets: [_pad:{off_pad}, payload:{off_payload}]");
+
+    // Version 1 regions have the payload at 48. Moving it again means bumping
+    // LAYOUT_VERSION and MIN_LAYOUT_VERSION, or old and new processes silently
+    // misread each other
+    assert_eq!(MIN_LAYOUT_VERSION, 2);
+    assert_eq!(off_pad, 48);
+    assert_eq!(off_payload, 64);
+}
+
+#[test]
+fn test_global_header_layout() {
+    let size = size_of::<GlobalHeader>();
+    let off_channel_count = offset_of!(GlobalHeader, channel_count);
+    let off_active = offset_of!(GlobalHeader, active);
+    let off_channels = offset_of!(GlobalHeader, channels);
+
+    println!(
+        "GlobalHeader => size: {size}, offsets: [channel_count:{off_channel_count}, active:{off_active}, channels:{off_channels}]"
+    );
+
+    // The active bitmap (version 3) sits in the former padding; channels must not move
+    assert_eq!(LAYOUT_VERSION, 3);
+    assert_eq!(size, 98432);
+    assert_eq!(off_channel_count, 16);
+    assert_eq!(off_active, 24);
+    assert_eq!(off_channels, 128);
+}
@@ -92,6 +92,50 @@ fn full_buffer() {
     }
 }
 
+#[test]
+fn dequeue_into_buffer() {
+    let capacity = 4;
+    let (ptr, layout) = make_aligned_backing(capacity);
+
+    let entry = create_dummy_channel_entry(capacity as u64);
+    let rb = unsafe { RingBuffer::new(&entry, ptr) };
+    unsafe {
+        rb.init_slots();
+    }
+
+    let meta = MessageMeta {
+        message_id: 7,
+        ..MessageMeta::default()
+    };
+    assert!(rb.enqueue(meta, b"hello").is_some());
+    assert!(rb.enqueue(meta, b"truncated").is_some());
+
+    // Fits: full payload and metadata come back
+    let mut out = [0u8; 16];
+    let (meta_out, len) = rb.dequeue_into(&mut out).unwrap();
+    assert_eq!(meta_out.message_id, 7);
+    assert_eq!(meta_out.payload_len, 5);
+    assert_eq!(&out[..len], b"hello");
+
+    // Shorter than the payload: truncated to out.len(), message still consumed
+    let mut short = [0u8; 4];
+    let (meta_out, len) = rb.dequeue_into(&mut short).unwrap();
+    assert_eq!(meta_out.payload_len, 9);
+    assert_eq!(len, 4);
+    assert_eq!(&short, b"trun");
+
+    assert!(rb.dequeue_into(&mut out).is_none());
+
+    // Slots were freed: the ring takes a full lap again
+    for _ in 0..capacity {
+        assert!(rb.enqueue(meta, b"x").is_some());
+    }
+
+    unsafe {
+        std::alloc::dealloc(ptr, layout);
+    }
+}
+
 #[test]
 fn small_mpmc_correctness() {
     let capacity = 8;
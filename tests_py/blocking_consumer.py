@@ -5,13 +5,19 @@ Blocking Python consumer example
 
 from consumer import PythonConsumer
 import sys
+import time
+
+# Log the receive rate every N messages when not in verbose mode
+RATE_INTERVAL = 100_000
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python blocking_consumer.py <channel_id>")
+    args = [a for a in sys.argv[1:] if a != "-v"]
+    verbose = len(args) != len(sys.argv) - 1
+    if len(args) < 1:
+        print("Usage: python blocking_consumer.py [-v] <channel_id>")
         sys.exit(1)
         
-    channel_id = int(sys.argv[1])
+    channel_id = int(args[0])
     
     print(f"Blocking Consumer: Connecting to channel {channel_id}")
     consumer = PythonConsumer()
@@ -19,13 +25,29 @@ def main():
     
     print("Blocking Consumer: Waiting for messages...")
     
+    # Each wakeup drains the whole backlog instead of one message per wait
+    consume_blocking = consumer.consume_blocking
+    count = 0
+    start = time.perf_counter()
     try:
-        while True:
-            msg = consumer.receive_blocking(channel_id)
-            payload = msg.payload.decode('utf-8', errors='ignore')
-            print(f"Received: {payload}")
+        if verbose:
+            # Raw payload bytes, one message per line (no decode or formatting)
+            write = sys.stdout.buffer.write
+            while True:
+                for msg in consume_blocking(channel_id):
+                    write(msg.payload)
+                    write(b"\n")
+                    count += 1
+        else:
+            next_report = RATE_INTERVAL
+            while True:
+                count += len(consume_blocking(channel_id))
+                if count >= next_report:
+                    next_report = count - count % RATE_INTERVAL + RATE_INTERVAL
+                    elapsed = time.perf_counter() - start
+                    print(f"Received {count} messages ({count / elapsed:,.0f} msg/s)")
     except KeyboardInterrupt:
-        print("\nStopping...")
+        print(f"\nStopping... ({count} messages received)")
     finally:
         consumer.close()
 
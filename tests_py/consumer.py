@@ -7,14 +7,67 @@ Reads messages from channels created by the Rust producer
 import ctypes as c
 import mmap
 import os
+import struct
 import time
-from dataclasses import dataclass
+from typing import NamedTuple
 
 # Constants
 MAX_CHANNELS = 256
+ACTIVE_WORDS = MAX_CHANNELS // 64  # u64 words in GlobalHeader.active
 MSG_INLINE = 960  # From Rust: 1024 - 64 (MessageMeta size)
 SLOT_SIZE = 1088  # From Rust print_layout: Slot size is 1088 bytes (64-byte aligned)
 MAGIC_NUMBER = 0x444D58505F4D454D  # "DMXP_MEM" in hex
+LAYOUT_VERSION = 3  # Newest GlobalHeader.version this file understands
+MIN_LAYOUT_VERSION = 2  # Oldest one with the same slot offsets (payload at 64)
+ACTIVE_BITMAP_VERSION = 3  # First version whose creators set the active bitmap
+WAIT_SLICE = 0.1  # Longest single native wait in receive_blocking (seconds)
+DRAIN_MAX_MSGS = 1024  # Messages per native drain call
+DRAIN_BUF_SIZE = 1024 * 1024  # Room for DRAIN_MAX_MSGS payloads of Rust's MSG_INLINE (1024)
+LIB_PATHS = [
+    "./target/debug/libdmxp_kvcache.so",
+    "./target/release/libdmxp_kvcache.so",
+    "./libdmxp_kvcache.so",
+]
+
+def _py_atomic_load_u64(addr):
+    """Fallback: aligned u64 loads are single-copy atomic on x86_64/aarch64"""
+    return c.c_uint64.from_address(addr).value
+
+def _py_atomic_fetch_add_u64(addr, delta):
+    """Fallback: plain read-modify-write (safe with a single consumer per channel)"""
+    cell = c.c_uint64.from_address(addr)
+    old = cell.value
+    cell.value = old + delta
+    return old
+
+def _load_lib():
+    """Load the Rust library for its shared-memory helpers (optional)"""
+    for path in LIB_PATHS:
+        if os.path.exists(path):
+            return c.CDLL(path)
+    return None
+
+def _bind(name, argtypes, restype):
+    """Bind a helper exported by the Rust library, or None if it is unavailable"""
+    fn = getattr(_lib, name, None)
+    if fn is not None:
+        fn.argtypes = argtypes
+        fn.restype = restype
+    return fn
+
+_lib = _load_lib()
+atomic_load_u64 = _bind("dmxp_atomic_load_u64", [c.c_void_p], c.c_uint64) or _py_atomic_load_u64
+atomic_fetch_add_u64 = _bind("dmxp_atomic_fetch_add_u64", [c.c_void_p, c.c_uint64], c.c_uint64) or _py_atomic_fetch_add_u64
+channel_wait = _bind("dmxp_channel_wait", [c.c_void_p, c.c_uint64, c.c_int64], c.c_int)
+channel_drain = _bind("dmxp_channel_drain", [c.c_void_p, c.c_void_p, c.c_size_t, c.c_void_p, c.c_size_t, c.c_void_p, c.c_void_p], c.c_int)
+
+# Linux futex constants (x86_64 syscall number), used when the Rust helper is unavailable
+SYS_futex = 202
+FUTEX_WAIT = 0
+_libc = c.CDLL(None)
+
+class Timespec(c.Structure):
+    _fields_ = [("tv_sec", c.c_long), ("tv_nsec", c.c_long)]
 
 # Structures matching Rust layout
 
@@ -23,15 +76,14 @@ class AtomicU64(c.Structure):
     _fields_ = [("value", c.c_uint64)]
 
 class CachePadded(c.Structure):
-    """CachePadded<AtomicU64> - 64 bytes total"""
+    """CachePadded<AtomicU64> - 128 bytes total (crossbeam pads to 128 on x86_64/aarch64)"""
     _fields_ = [
         ("value", AtomicU64),
-        ("_pad", c.c_uint8 * 56)  # Pad to 64 bytes
+        ("_pad", c.c_uint8 * 120)  # Pad to 128 bytes
     ]
 
 class MessageMeta(c.Structure):
-    """Message metadata - 40 bytes"""
-    _pack_ = 1
+    """Message metadata - 40 bytes (natural alignment, payload_len at offset 32)"""
     _fields_ = [
         ("message_id", c.c_uint64),
         ("timestamp_ns", c.c_uint64),
@@ -43,6 +95,14 @@ class MessageMeta(c.Structure):
         ("payload_len", c.c_uint32),
     ]
 
+class BatchEntry(c.Structure):
+    """FFIBatchEntry filled by dmxp_channel_drain: payload at out_buf[offset:offset + len]"""
+    _fields_ = [
+        ("offset", c.c_uint32),
+        ("len", c.c_uint32),
+        ("meta", MessageMeta),
+    ]
+
 class Slot(c.Structure):
     """Slot structure - 1024 bytes, 128-byte aligned"""
     _pack_ = 128
@@ -53,6 +113,10 @@ class Slot(c.Structure):
         ("payload", c.c_uint8 * MSG_INLINE),
     ]
 
+# Payload offset inside a slot, and the most bytes that fit before the next slot
+SLOT_PAYLOAD_OFFSET = Slot.payload.offset
+SLOT_PAYLOAD_MAX = SLOT_SIZE - SLOT_PAYLOAD_OFFSET
+
 class ChannelEntry(c.Structure):
     """Channel metadata - 384 bytes total, 128-byte aligned
     Layout from Rust:
@@ -60,18 +124,19 @@ class ChannelEntry(c.Structure):
       flags: offset 4
       capacity: offset 8
       band_offset: offset 16
-      tail: offset 128 (CachePadded<AtomicU64> = 64 bytes)
-      head: offset 256 (CachePadded<AtomicU64> = 64 bytes)
+      signal: offset 24
+      tail: offset 128 (CachePadded<AtomicU64> = 128 bytes)
+      head: offset 256 (CachePadded<AtomicU64> = 128 bytes)
     """
     _fields_ = [
         ("channel_id", c.c_uint32),      # offset 0
         ("flags", c.c_uint32),            # offset 4
         ("capacity", c.c_uint64),         # offset 8
         ("band_offset", c.c_uint64),      # offset 16
-        ("_pad1", c.c_uint8 * 104),       # pad to offset 128
-        ("tail", CachePadded),            # offset 128, 64 bytes
-        ("head", CachePadded),            # offset 256, 64 bytes
-        ("_pad2", c.c_uint8 * 64),        # pad to 384 bytes total
+        ("signal", c.c_uint32),           # offset 24
+        ("_pad1", c.c_uint8 * 100),       # pad to offset 128
+        ("tail", CachePadded),            # offset 128, 128 bytes
+        ("head", CachePadded),            # offset 256, 128 bytes
     ]
 
 class GlobalHeader(c.Structure):
@@ -82,6 +147,7 @@ class GlobalHeader(c.Structure):
       max_channels: offset 12
       channel_count: offset 16
       reserved: offset 20
+      active: offset 24 (bit id % 64 of word id // 64 set per active channel)
       channels: offset 128
     """
     _fields_ = [
@@ -90,13 +156,35 @@ class GlobalHeader(c.Structure):
         ("max_channels", c.c_uint32),     # offset 12
         ("channel_count", c.c_uint32),    # offset 16
         ("reserved", c.c_uint32),         # offset 20
-        ("_pad", c.c_uint8 * 104),        # pad to offset 128
+        ("active", c.c_uint64 * ACTIVE_WORDS),  # offset 24, active-channel bitmap
+        ("_pad", c.c_uint8 * 72),         # pad to offset 128
         ("channels", ChannelEntry * MAX_CHANNELS),  # offset 128
     ]
 
-@dataclass
-class Message:
-    """Decoded message"""
+# u64 index of the active-channel bitmap in the global header
+ACTIVE_U64_INDEX = GlobalHeader.active.offset // 8
+
+# Byte offsets used by the hot paths, which read through word views of the mmap
+# instead of overlaying Structures (no per-access field descriptor or proxy object)
+CHANNELS_BASE = GlobalHeader.channels.offset       # 128
+CHANNEL_STRIDE = c.sizeof(ChannelEntry)            # 384
+CAP_OFF = ChannelEntry.capacity.offset             # 8
+BAND_OFF = ChannelEntry.band_offset.offset         # 16
+SIGNAL_OFF = ChannelEntry.signal.offset            # 24
+TAIL_OFF = ChannelEntry.tail.offset                # 128
+HEAD_OFF = ChannelEntry.head.offset                # 256
+PAYLOAD_LEN_OFF = Slot.meta.offset + MessageMeta.payload_len.offset    # 40
+
+# One ChannelEntry row: channel_id, flags, capacity, band_offset, tail (128), head (256)
+_ENTRY_ROW = struct.Struct(f"<IIQQ{TAIL_OFF - 24}xQ{HEAD_OFF - TAIL_OFF - 8}xQ")
+
+# Slot header: sequence, then MessageMeta (message_id, timestamp_ns, channel_id,
+# message_type, sender_pid, sender_runtime, flags, payload_len). Fields are decoded
+# in address order, so the sequence is read before the metadata it publishes.
+_SLOT_HDR = struct.Struct("<QQQIIIHHI")
+
+class Message(NamedTuple):
+    """Decoded message (a NamedTuple: fields by name or position, no per-instance __dict__)"""
     channel_id: int
     message_id: int
     timestamp_ns: int
@@ -109,6 +197,19 @@ class PythonConsumer:
         self.shm_path = shm_path
         self.mm = None
         self.header = None
+        self._mm_view = None
+        self._u64 = None
+        self._u32 = None
+        self._base = 0
+        self._has_bitmap = False
+        # channel_id -> (band_offset, head_addr, tail_addr, capacity, capacity - 1)
+        self._chan = {}
+        
+        # Output buffers for the native drain, allocated once and reused
+        if channel_drain is not None:
+            self._drain_buf = (c.c_uint8 * DRAIN_BUF_SIZE)()
+            self._drain_entries = (BatchEntry * DRAIN_MAX_MSGS)()
+            self._drain_count = c.c_size_t(0)
         
     def attach(self):
         """Attach to existing shared memory"""
@@ -123,37 +224,86 @@ class PythonConsumer:
         
         # Read global header
         self.header = GlobalHeader.from_buffer(self.mm)
+        self._mm_view = memoryview(self.mm)
+        self._u64 = self._mm_view.cast('Q')
+        self._u32 = self._mm_view.cast('I')
+        self._base = c.addressof(self.header)
         
         # Validate magic number
         if self.header.magic != MAGIC_NUMBER:
             raise ValueError(f"Invalid magic number: {self.header.magic:x}")
+        if not MIN_LAYOUT_VERSION <= self.header.version <= LAYOUT_VERSION:
+            raise ValueError(f"Unsupported layout version {self.header.version} "
+                             f"(expected {MIN_LAYOUT_VERSION}..{LAYOUT_VERSION})")
+        self._has_bitmap = self.header.version >= ACTIVE_BITMAP_VERSION
         
         print(f"✓ Attached to shared memory")
         print(f"  Version: {self.header.version}")
         print(f"  Active channels: {self.header.channel_count}")
         
-    def get_channel_info(self, channel_id):
-        """Get channel metadata by reading raw bytes"""
+        # Cache raw cursor addresses for every active channel
+        for channel_id in self._active_channels():
+            self._cache_channel(channel_id)
+    
+    def _active_channels(self):
+        """IDs of the channels set in the GlobalHeader active bitmap, in ascending order.
+        Pre-bitmap regions yield every ID; callers skip the ones with zero capacity."""
+        if not self._has_bitmap:
+            return range(MAX_CHANNELS)
+        ids = []
+        words = self._u64[ACTIVE_U64_INDEX:ACTIVE_U64_INDEX + ACTIVE_WORDS].tolist()
+        for word_index, bits in enumerate(words):
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                ids.append(word_index * 64 + low.bit_length() - 1)
+        return ids
+    
+    def _cache_channel(self, channel_id):
+        """Cache a channel's band offset, cursor addresses, capacity and index mask (None if inactive)"""
         if channel_id >= MAX_CHANNELS:
             return None
         
-        # Calculate offset: channels start at 128, each entry is 384 bytes
-        offset = 128 + (channel_id * 384)
+        entry_offset = CHANNELS_BASE + channel_id * CHANNEL_STRIDE
+        capacity = self._u64[(entry_offset + CAP_OFF) >> 3]
+        if capacity == 0:
+            return None
         
-        # Read fields directly from memory
-        self.mm.seek(offset)
-        data = self.mm.read(384)
+        # The Rust allocator only creates power-of-two rings, so slots are
+        # indexed with `head & mask` instead of a modulo
+        if capacity & (capacity - 1):
+            raise ValueError(f"Channel {channel_id} capacity {capacity} is not a power of two")
+        
+        entry_addr = self._base + entry_offset
+        chan = (
+            self._u64[(entry_offset + BAND_OFF) >> 3],
+            entry_addr + HEAD_OFF,
+            entry_addr + TAIL_OFF,
+            capacity,
+            capacity - 1,
+        )
+        self._chan[channel_id] = chan
+        self._advise_sequential(chan[0], capacity)
+        return chan
+    
+    def _advise_sequential(self, band_offset, capacity):
+        """Hint that a channel's slot band is read front to back (madvise needs a page-aligned start)"""
+        if not hasattr(mmap, "MADV_SEQUENTIAL"):
+            return
+        start = band_offset & ~(mmap.PAGESIZE - 1)
+        end = min(band_offset + capacity * SLOT_SIZE, len(self.mm))
+        self.mm.madvise(mmap.MADV_SEQUENTIAL, start, end - start)
         
-        ch_id = int.from_bytes(data[0:4], 'little')
-        flags = int.from_bytes(data[4:8], 'little')
-        capacity = int.from_bytes(data[8:16], 'little')
-        band_offset = int.from_bytes(data[16:24], 'little')
-        tail = int.from_bytes(data[128:136], 'little')
-        head = int.from_bytes(data[256:264], 'little')
+    def get_channel_info(self, channel_id):
+        """Get channel metadata (the same dict as a list_channels() entry), or None if inactive"""
+        if channel_id >= MAX_CHANNELS:
+            return None
         
+        # Unpack straight out of the mmap: no seek, no 384-byte read
+        offset = CHANNELS_BASE + channel_id * CHANNEL_STRIDE
+        ch_id, _flags, capacity, band_offset, tail, head = _ENTRY_ROW.unpack_from(self.mm, offset)
         if capacity == 0:
             return None
-        
         return {
             'channel_id': ch_id,
             'capacity': capacity,
@@ -164,26 +314,35 @@ class PythonConsumer:
     
     def list_channels(self):
         """List all active channels"""
+        # Discover channels from the 32-byte active bitmap, then one row unpack per channel
+        mm = self.mm
+        unpack_from = _ENTRY_ROW.unpack_from
         channels = []
-        for i in range(MAX_CHANNELS):
-            info = self.get_channel_info(i)
-            if info:
-                channels.append(info)
+        for channel_id in self._active_channels():
+            _ch_id, _flags, capacity, band_offset, tail, head = unpack_from(
+                mm, CHANNELS_BASE + channel_id * CHANNEL_STRIDE)
+            if capacity:
+                channels.append({
+                    'channel_id': channel_id,
+                    'capacity': capacity,
+                    'band_offset': band_offset,
+                    'head': head,
+                    'tail': tail,
+                })
         return channels
     
     def receive(self, channel_id, debug=False):
         """Receive one message from a channel"""
-        info = self.get_channel_info(channel_id)
-        if not info:
+        chan = self._chan.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
             if debug:
                 print(f"Channel {channel_id}: No channel info")
             return None
+        band_offset, head_addr, tail_addr, capacity, mask = chan
         
-        # Get current head and tail positions
-        head = info['head']
-        tail = info['tail']
-        capacity = info['capacity']
-        band_offset = info['band_offset']
+        # Get current head and tail positions (acquire loads)
+        head = atomic_load_u64(head_addr)
+        tail = atomic_load_u64(tail_addr)
         
         if debug:
             print(f"Channel {channel_id}: head={head}, tail={tail}, capacity={capacity}")
@@ -195,24 +354,21 @@ class PythonConsumer:
             return None
         
         # Calculate slot position
-        pos = head % capacity
+        pos = head & mask
         slot_offset = band_offset + (pos * SLOT_SIZE)
         
         if debug:
             print(f"Channel {channel_id}: Reading slot at offset {slot_offset} (pos={pos})")
         
-        # Read slot
+        # Sequence and metadata in one unpack straight out of the mmap (zero-copy)
         try:
-            self.mm.seek(slot_offset)
-            slot_data = self.mm.read(SLOT_SIZE)
-        except Exception as e:
+            (sequence, message_id, timestamp_ns, msg_channel_id,
+             _type, _pid, _runtime, _flags, payload_len) = _SLOT_HDR.unpack_from(self._mm_view, slot_offset)
+        except struct.error as e:
             if debug:
                 print(f"Channel {channel_id}: Error reading slot: {e}")
             return None
         
-        # Read sequence number (first 8 bytes)
-        sequence = int.from_bytes(slot_data[0:8], 'little')
-        
         if debug:
             print(f"Channel {channel_id}: Slot sequence={sequence}, expected={head+1}")
         
@@ -222,99 +378,272 @@ class PythonConsumer:
                 print(f"Channel {channel_id}: Sequence mismatch")
             return None
         
-        # Read MessageMeta (starts at offset 8 in slot, after sequence)
-        meta_offset = 8
-        message_id = int.from_bytes(slot_data[meta_offset:meta_offset+8], 'little')
-        timestamp_ns = int.from_bytes(slot_data[meta_offset+8:meta_offset+16], 'little')
-        ch_id = int.from_bytes(slot_data[meta_offset+16:meta_offset+20], 'little')
-        payload_len = int.from_bytes(slot_data[meta_offset+32:meta_offset+36], 'little')
+        payload_len = min(payload_len, SLOT_PAYLOAD_MAX)
         
-        # Payload starts after sequence (8) + MessageMeta (40) + padding (16) = 64 bytes
-        payload_offset = 64
-        payload = slot_data[payload_offset:payload_offset+payload_len]
+        # Single memcpy of exactly payload_len bytes out of shared memory
+        payload = c.string_at(self._base + slot_offset + SLOT_PAYLOAD_OFFSET, payload_len)
         
         message = Message(
-            channel_id=ch_id,
+            channel_id=msg_channel_id,
             message_id=message_id,
             timestamp_ns=timestamp_ns,
             payload=payload
         )
         
-        # Increment head - write back to shared memory
-        new_head = head + 1
-        head_offset = 128 + (channel_id * 384) + 256  # ChannelEntry.head offset
-        self.mm.seek(head_offset)
-        self.mm.write(new_head.to_bytes(8, 'little'))
+        # Release the slot the way RingBuffer::dequeue does (sequence = head +
+        # capacity), so producers following the ring protocol can reuse it,
+        # then increment head - write back to shared memory
+        self._u64[slot_offset >> 3] = head + capacity
+        atomic_fetch_add_u64(head_addr, 1)
         
         return message
     
+    def receive_into(self, channel_id, buf):
+        """Copy the next message's payload into buf, a preallocated writable buffer.
+        
+        No bytes or Message object is created: the payload is memmoved straight
+        from the slot into buf, so one bytearray can be reused for every receive.
+        If the payload is longer than buf, ValueError is raised and the message
+        stays queued (head is not advanced), so it can be retried with a larger buffer.
+        Returns the number of bytes written, or None if no message was available.
+        """
+        chan = self._chan.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
+            return None
+        band_offset, head_addr, tail_addr, capacity, mask = chan
+        
+        head = atomic_load_u64(head_addr)
+        if head == atomic_load_u64(tail_addr):
+            return None
+        
+        slot_offset = band_offset + (head & mask) * SLOT_SIZE
+        if self._u64[slot_offset >> 3] != head + 1:
+            return None
+        
+        payload_len = min(self._u32[(slot_offset + PAYLOAD_LEN_OFF) >> 2], SLOT_PAYLOAD_MAX)
+        if payload_len > len(buf):
+            raise ValueError(f"Buffer too small: message needs {payload_len} bytes, buf has {len(buf)}")
+        # Copy by address: no ctypes array type is created per call
+        if payload_len:
+            c.memmove(c.addressof(c.c_char.from_buffer(buf)),
+                      self._base + slot_offset + SLOT_PAYLOAD_OFFSET, payload_len)
+        
+        self._u64[slot_offset >> 3] = head + capacity  # release, as in receive()
+        atomic_fetch_add_u64(head_addr, 1)
+        return payload_len
+    
+    def receive_zerocopy(self, channel_id, callback):
+        """Pass the next message's payload to callback(payload) without copying it.
+        
+        payload is a memoryview aliasing the slot in shared memory. It is only
+        valid inside the callback: head is advanced once the callback returns,
+        after which producers may overwrite the slot, so the view is released
+        first and any reference kept past the callback raises ValueError on use.
+        If the callback raises, head is not advanced and the message is redelivered.
+        Returns True if a message was delivered, False if none was available.
+        """
+        chan = self._chan.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
+            return False
+        band_offset, head_addr, tail_addr, capacity, mask = chan
+        
+        head = atomic_load_u64(head_addr)
+        if head == atomic_load_u64(tail_addr):
+            return False
+        
+        slot_offset = band_offset + (head & mask) * SLOT_SIZE
+        if self._u64[slot_offset >> 3] != head + 1:
+            return False
+        
+        payload_offset = slot_offset + SLOT_PAYLOAD_OFFSET
+        payload_len = min(self._u32[(slot_offset + PAYLOAD_LEN_OFF) >> 2], SLOT_PAYLOAD_MAX)
+        payload = self._mm_view[payload_offset:payload_offset + payload_len]
+        try:
+            callback(payload)
+        finally:
+            payload.release()
+        
+        self._u64[slot_offset >> 3] = head + capacity  # release, as in receive()
+        atomic_fetch_add_u64(head_addr, 1)
+        return True
+    
     def consume_all(self, channel_id, max_messages=None):
         """Consume all available messages from a channel"""
+        chan = self._chan.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
+            return []
+        band_offset, head_addr, tail_addr, capacity, mask = chan
+        
+        if channel_drain is not None:
+            return self._consume_native(channel_id, band_offset, max_messages)
+        
+        # Drain loop with receive() inlined and everything it touches bound to locals
+        view = self._mm_view
+        u64 = self._u64
+        unpack_slot = _SLOT_HDR.unpack_from
+        base = self._base
+        string_at = c.string_at
+        load = atomic_load_u64
+        fetch_add = atomic_fetch_add_u64
         messages = []
-        count = 0
+        append = messages.append
         
-        while True:
-            if max_messages and count >= max_messages:
-                break
+        start = head = load(head_addr)
+        tail = head
+        limit = head + max_messages if max_messages else None
+        
+        while limit is None or head < limit:
+            if head == tail:
+                tail = load(tail_addr)
+                if head == tail:
+                    break
             
-            msg = self.receive(channel_id)
-            if msg is None:
+            slot_offset = band_offset + (head & mask) * SLOT_SIZE
+            (sequence, message_id, timestamp_ns, msg_channel_id,
+             _type, _pid, _runtime, _flags, payload_len) = unpack_slot(view, slot_offset)
+            if sequence != head + 1:
                 break
             
-            messages.append(msg)
-            count += 1
+            # Positional fields (channel_id, message_id, timestamp_ns, payload):
+            # keyword binding costs more than the tuple construction itself
+            append(Message(
+                msg_channel_id,
+                message_id,
+                timestamp_ns,
+                string_at(base + slot_offset + SLOT_PAYLOAD_OFFSET, min(payload_len, SLOT_PAYLOAD_MAX))
+            ))
+            # Release the slot for reuse (its own cache line, already being read)
+            u64[slot_offset >> 3] = head + capacity
+            head += 1
+        
+        # Everything is copied out, so advance head with a single store rather
+        # than one write to the shared cursor line per message
+        if head != start:
+            fetch_add(head_addr, head - start)
         
         return messages
     
-    def receive_blocking(self, channel_id, timeout=None):
-        """Receive a message, blocking until one is available"""
-        # Linux futex constants
-        SYS_futex = 202
-        FUTEX_WAIT = 0
-        FUTEX_PRIVATE_FLAG = 128
+    def _consume_native(self, channel_id, band_offset, max_messages):
+        """consume_all() via dmxp_channel_drain: one FFI call per DRAIN_MAX_MSGS messages"""
+        entry_addr = self._base + CHANNELS_BASE + channel_id * CHANNEL_STRIDE
+        band_addr = self._base + band_offset
+        buf = self._drain_buf
+        entries = self._drain_entries
+        count_ptr = c.byref(self._drain_count)
+        messages = []
+        append = messages.append
+        remaining = max_messages or None
         
-        while True:
-            # Try to receive
-            msg = self.receive(channel_id)
-            if msg:
-                return msg
-            
-            # If no message, wait on signal
-            info = self.get_channel_info(channel_id)
-            if not info:
-                raise ValueError(f"Channel {channel_id} not found")
+        while remaining is None or remaining > 0:
+            batch = DRAIN_MAX_MSGS if remaining is None else min(remaining, DRAIN_MAX_MSGS)
+            if channel_drain(entry_addr, band_addr, batch, buf, DRAIN_BUF_SIZE, entries, count_ptr) != 0:
+                break
             
-            # Signal is at offset 24 (after band_offset)
-            signal_offset = 128 + (channel_id * 384) + 24
+            count = self._drain_count.value
+            last = entries[count - 1]
+            # One copy out of the drain buffer; per-message payloads are slices of it
+            data = c.string_at(buf, last.offset + last.len)
+            for entry in entries[:count]:
+                meta = entry.meta
+                append(Message(
+                    meta.channel_id,
+                    meta.message_id,
+                    meta.timestamp_ns,
+                    data[entry.offset:entry.offset + entry.len]
+                ))
             
-            # Read current signal value
-            self.mm.seek(signal_offset)
-            val = int.from_bytes(self.mm.read(4), 'little')
+            if remaining is not None:
+                remaining -= count
+            if count < batch:
+                break
+        
+        return messages
+    
+    def wait(self, channel_id, timeout=None):
+        """Block until a message may be available past the current head.
+        
+        Spins briefly and then parks on the channel's futex signal word, which
+        producers bump and wake on every publish.
+        timeout: seconds, or None to wait forever.
+        Returns False if the timeout elapsed first.
+        """
+        chan = self._chan.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
+            raise ValueError(f"Channel {channel_id} not found")
+        band_offset, head_addr, tail_addr, capacity, mask = chan
+        
+        head = atomic_load_u64(head_addr)
+        entry_addr = self._base + CHANNELS_BASE + channel_id * CHANNEL_STRIDE
+        
+        if channel_wait is not None:
+            timeout_ns = -1 if timeout is None else int(timeout * 1_000_000_000)
+            return channel_wait(entry_addr, head, timeout_ns) == 0
+        
+        # No Rust library: futex directly on the signal word
+        signal = c.c_uint32.from_address(entry_addr + SIGNAL_OFF)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            val = signal.value
+            if atomic_load_u64(tail_addr) > head:
+                return True
             
-            # Wait using futex syscall
-            # syscall(SYS_futex, addr, op, val, timeout, addr2, val3)
-            # We need the address of the signal in the mmapped region
-            # ctypes.addressof(self.mm) doesn't work directly on mmap object
-            # We need to get the buffer address.
+            ts = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                ts = c.byref(Timespec(int(remaining), int((remaining % 1) * 1_000_000_000)))
             
-            # For Python mmap, we can use from_buffer to get a ctypes pointer
-            # But mmap in Python doesn't expose the base address easily.
-            # Workaround: Use ctypes to cast the buffer
+            # Shared (non-private) futex: producers live in other processes
+            _libc.syscall(SYS_futex, c.c_void_p(c.addressof(signal)), FUTEX_WAIT, c.c_uint32(val), ts, None, 0)
+    
+    def receive_blocking(self, channel_id, timeout=None):
+        """Receive a message, blocking until one is available (None on timeout)"""
+        return self._block_on(channel_id, timeout, self.receive, None)
+    
+    def consume_blocking(self, channel_id, max_messages=None, timeout=None):
+        """Block until at least one message is available, then drain up to
+        max_messages in one go (consume_all). Returns [] on timeout.
+        
+        Cheaper than receive_blocking() per message under load: the whole
+        backlog is copied out and head advanced once, instead of a receive
+        and a wait check per message.
+        """
+        return self._block_on(channel_id, timeout,
+                              lambda cid: self.consume_all(cid, max_messages), [])
+    
+    def _block_on(self, channel_id, timeout, poll, empty):
+        """Call poll(channel_id) until it returns something truthy, parking in between"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            result = poll(channel_id)
+            if result:
+                return result
             
-            buf = (c.c_char * len(self.mm)).from_buffer(self.mm)
-            base_addr = c.addressof(buf)
-            signal_addr = base_addr + signal_offset
+            # Park in bounded slices so Ctrl-C is handled between native waits
+            remaining = WAIT_SLICE
+            if deadline is not None:
+                remaining = min(deadline - time.monotonic(), WAIT_SLICE)
+                if remaining <= 0:
+                    return empty
             
-            libc = c.CDLL(None)
-            libc.syscall(SYS_futex, signal_addr, FUTEX_WAIT | FUTEX_PRIVATE_FLAG, val, 0, 0, 0)
+            self.wait(channel_id, remaining)
             
     def close(self):
         """Close shared memory"""
+        # Drop every export of the mmap first so close() cannot raise BufferError
+        self.header = None
+        self._chan = {}
+        for view in (self._u64, self._u32, self._mm_view):
+            if view is not None:
+                view.release()
+        self._u64 = self._u32 = self._mm_view = None
+        self._base = 0
+        
         if self.mm:
-            try:
-                self.mm.close()
-            except BufferError:
-                pass  # Ignore buffer errors on close
+            self.mm.close()
+            self.mm = None
 
 def main():
     """Example usage"""
@@ -339,7 +668,7 @@ def main():
         # Consume from all requested channels
         start_time = time.time()
         total_received = 0
-        channel_stats = {}
+        channel_stats = [0] * num_channels
         
         for channel_id in range(num_channels):
             print(f"\nConsuming from channel {channel_id}...")
@@ -372,7 +701,7 @@ def main():
         print("Per-Channel Breakdown:")
         print("-" * 80)
         
-        for channel_id, count in channel_stats.items():
+        for channel_id, count in enumerate(channel_stats):
             percentage = (count / expected_per_channel) * 100 if expected_per_channel > 0 else 0
             print(f"  Channel {channel_id:2}: {count:6} messages ({percentage:5.1f}%)")
         
